@@ -4,6 +4,7 @@ from settings import WIDTH, HEIGHT
 from src.board import load_pieces
 from src.menu import run_menu
 from src.game import run_game
+from src.worker import shutdown_ai_worker
 
 def main():
     pygame.init()
@@ -26,15 +27,18 @@ def main():
 
         # Unpack result
         if isinstance(result[0], chess.Board):
-            # Loaded game: (board, depth, ai_color, player_color)
-            board, depth, ai_color, player_color = result
+            # Loaded game: (board, depth, ai_color, player_color, move_time, slot)
+            board, depth, ai_color, player_color, move_time, slot = result
+            resume = True
         else:
-            # New game: (depth, ai_color, player_color, None)
-            depth, ai_color, player_color, _ = result
+            # New game: (depth, ai_color, player_color, None, move_time, slot)
+            depth, ai_color, player_color, _, move_time, slot = result
             board = chess.Board()
+            resume = False
 
         # Run game
-        outcome = run_game(screen, clock, board, depth, ai_color, player_color)
+        outcome = run_game(screen, clock, board, depth, ai_color, player_color, move_time,
+                           slot, resume)
         if outcome == 'quit':
             running = False
         elif outcome == 'menu':
@@ -42,9 +46,11 @@ def main():
         elif outcome == 'new':
             # Start a new game with same settings
             board = chess.Board()
-            outcome = run_game(screen, clock, board, depth, ai_color, player_color)
+            outcome = run_game(screen, clock, board, depth, ai_color, player_color, move_time,
+                               slot)
             # (loop will handle outcome)
 
+    shutdown_ai_worker()
     pygame.quit()
 
 if __name__ == "__main__":
@@ -1,5 +1,4 @@
 import chess
-import pygame
 
 # -----------------------------------------------------------------
 # Window & Board – base size (menu uses these dimensions)
@@ -34,8 +33,14 @@ PANEL_TEXT = (30, 30, 30)
 # Timing
 # -----------------------------------------------------------------
 AI_DELAY = 400
+AI_MOVE_TIME = 0                 # ms per AI move; 0 = fixed-depth search
+MOVE_TIME_CHOICES = [0, 500, 1000, 2000, 5000]
+PONDER = True                    # search the expected reply during the human's turn
 ANIMATION_SPEED = 0.15
-FPS = 60
+FPS = 60                         # frame rate while something moves on screen
+IDLE_WAIT = 500                  # ms the loops block waiting for input when nothing moves
+THINKING_POLL = 50               # ms between checks on the AI worker while it searches
+TEXT_CACHE_SIZE = 256            # rendered text surfaces kept for reuse
 
 # -----------------------------------------------------------------
 # AI Search depths
@@ -43,6 +48,51 @@ FPS = 60
 MIN_DEPTH = 1
 MAX_DEPTH = 6
 DEFAULT_DEPTH = 3
+MAX_SEARCH_DEPTH = 32            # iterative deepening cap in timed mode
+ASPIRATION_WINDOW = 0.5          # pawns either side of the last score
+DELTA_MARGIN = 2                 # pawns of slack before a capture is delta-pruned
+QS_NODE_LIMIT = 4000             # quiescence nodes allowed per alpha-beta leaf
+SEE_PRUNE_DEPTH = 1              # plies from the horizon where losing captures are skipped
+SEARCH_WORKERS = 1               # processes for root-parallel alpha-beta; 1 = serial
+MATE_SCORE = 1000                # pawns; mate n plies from the root scores MATE_SCORE - n
+SEARCH_ALGORITHM = "alphabeta"   # depth >= 3 and timed search: "alphabeta" or "pvs"
+NULL_MOVE_REDUCTION = 2          # pvs: plies a null-move search is cut short by...
+NULL_MOVE_MIN_DEPTH = 3          # ...tried this many plies or more from the horizon
+LMR_MIN_DEPTH = 3                # pvs: reduce late quiet moves this far from the horizon...
+LMR_FULL_MOVES = 3               # ...after this many moves searched at full depth
+
+# -----------------------------------------------------------------
+# UCI time management
+# -----------------------------------------------------------------
+UCI_MOVES_TO_GO = 30             # assumed moves left when the GUI doesn't say
+UCI_MOVE_OVERHEAD = 50           # ms kept back per move for I/O and GUI lag
+
+# -----------------------------------------------------------------
+# Self-play matches (python -m src.match)
+# -----------------------------------------------------------------
+MATCH_TT_SIZE_MB = 16            # per engine per game, so sides never share a table
+MATCH_MAX_PLIES = 300            # adjudicate a draw after this many plies
+ADJ_RESIGN_SCORE = 6             # pawns; both engines agree one side is this far ahead...
+ADJ_RESIGN_PLIES = 6             # ...for this many plies in a row
+ADJ_DRAW_SCORE = 0.1             # pawns; both engines see a dead-level game...
+ADJ_DRAW_PLIES = 16              # ...for this many plies in a row...
+ADJ_DRAW_MIN_PLY = 80            # ...after this ply
+
+# -----------------------------------------------------------------
+# Batch analysis (python -m src.analyze)
+# -----------------------------------------------------------------
+ANALYSIS_DEPTH = 3               # fixed search depth per position
+ANALYSIS_TT_SIZE_MB = 16         # per worker
+ANALYSIS_CHUNK = 8               # consecutive positions per task, sharing a fresh table
+ANALYSIS_QUEUE = 64              # positions in flight per worker; bounds memory
+ANALYSIS_SCORE_CAP = 10          # pawns; scores are clipped to this (mate = cap)
+ANALYSIS_MISTAKE = 1.0           # pawns lost against the best move to flag a mistake...
+ANALYSIS_BLUNDER = 2.0           # ...or a blunder
+
+# -----------------------------------------------------------------
+# Transposition table
+# -----------------------------------------------------------------
+TT_SIZE_MB = 64                  # memory cap; 0 disables the table
 
 # -----------------------------------------------------------------
 # Piece values
@@ -56,10 +106,31 @@ PIECE_VALUES = {
     chess.KING: 0
 }
 
+# -----------------------------------------------------------------
+# Evaluation
+# -----------------------------------------------------------------
+EVALUATOR = "incremental"        # "incremental", "squares" (full scan) or "bitboard"
+EVAL_PIECE_SQUARE = True         # add piece-square tables to material
+EVAL_STRUCTURE = True            # bitboard evaluator: pawn structure, bishop pair,
+                                 # rooks on open files, king pawn shield
+EVAL_DEBUG = False               # cross-check incremental and cached evals against a full recompute
+PAWN_HASH_ENTRIES = 16384        # bitboard evaluator: cached pawn-structure scores; 0 = off
+EVAL_CACHE_ENTRIES = 65536       # cached full evaluations per evaluator (not incremental); 0 = off
+
 # -----------------------------------------------------------------
 # Paths
 # -----------------------------------------------------------------
 ASSETS_DIR = "assets"
 IMAGES_DIR = f"{ASSETS_DIR}/images"
 SOUNDS_DIR = f"{ASSETS_DIR}/sounds"
-SAVE_FILE = "save.json"
\ No newline at end of file
+SAVE_FILE = "save.json"          # single-FEN save of earlier versions; loads as the first slot
+SAVE_DIR = "saves"               # one journal + checkpoint per save slot
+SAVE_SLOTS = 3
+JOURNAL_SYNC_EVERY = 8           # journal lines written between fsyncs
+STATS_LOG = None                 # path to append one JSON line of search stats per AI move
+
+# -----------------------------------------------------------------
+# Opening book (Polyglot .bin; skipped if the file is missing)
+# -----------------------------------------------------------------
+BOOK_PATH = f"{ASSETS_DIR}/book.bin"
+BOOK_MAX_PLY = 16                # plies from the start position to consult it
\ No newline at end of file
@@ -1,23 +1,589 @@
+import multiprocessing
 import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 import chess
-from settings import PIECE_VALUES
+import chess.polyglot
+from settings import (
+    PIECE_VALUES, TT_SIZE_MB, MAX_SEARCH_DEPTH, ASPIRATION_WINDOW,
+    DELTA_MARGIN, QS_NODE_LIMIT, SEE_PRUNE_DEPTH, SEARCH_WORKERS, EVALUATOR, EVAL_PIECE_SQUARE,
+    EVAL_STRUCTURE, EVAL_DEBUG, PAWN_HASH_ENTRIES, EVAL_CACHE_ENTRIES, MATE_SCORE, SEARCH_ALGORITHM, NULL_MOVE_REDUCTION,
+    NULL_MOVE_MIN_DEPTH, LMR_MIN_DEPTH, LMR_FULL_MOVES
+)
+from src.book import book_move
+from src.searchboard import SearchBoard, to_move
 
 # -----------------------------------------------------------------
 # Evaluation
 # -----------------------------------------------------------------
-def evaluate_board(board):
-    """Score from White's perspective. Positive = White advantage."""
+# Piece-square tables in centipawns, written from White's side with rank 8
+# on the first row (so a white piece on square s reads entry s ^ 56).
+PIECE_SQUARE_TABLES = {
+    chess.PAWN: [
+          0,   0,   0,   0,   0,   0,   0,   0,
+         50,  50,  50,  50,  50,  50,  50,  50,
+         10,  10,  20,  30,  30,  20,  10,  10,
+          5,   5,  10,  25,  25,  10,   5,   5,
+          0,   0,   0,  20,  20,   0,   0,   0,
+          5,  -5, -10,   0,   0, -10,  -5,   5,
+          5,  10,  10, -20, -20,  10,  10,   5,
+          0,   0,   0,   0,   0,   0,   0,   0,
+    ],
+    chess.KNIGHT: [
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20,   0,   0,   0,   0, -20, -40,
+        -30,   0,  10,  15,  15,  10,   0, -30,
+        -30,   5,  15,  20,  20,  15,   5, -30,
+        -30,   0,  15,  20,  20,  15,   0, -30,
+        -30,   5,  10,  15,  15,  10,   5, -30,
+        -40, -20,   0,   5,   5,   0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50,
+    ],
+    chess.BISHOP: [
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10,   0,   0,   0,   0,   0,   0, -10,
+        -10,   0,   5,  10,  10,   5,   0, -10,
+        -10,   5,   5,  10,  10,   5,   5, -10,
+        -10,   0,  10,  10,  10,  10,   0, -10,
+        -10,  10,  10,  10,  10,  10,  10, -10,
+        -10,   5,   0,   0,   0,   0,   5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20,
+    ],
+    chess.ROOK: [
+          0,   0,   0,   0,   0,   0,   0,   0,
+          5,  10,  10,  10,  10,  10,  10,   5,
+         -5,   0,   0,   0,   0,   0,   0,  -5,
+         -5,   0,   0,   0,   0,   0,   0,  -5,
+         -5,   0,   0,   0,   0,   0,   0,  -5,
+         -5,   0,   0,   0,   0,   0,   0,  -5,
+         -5,   0,   0,   0,   0,   0,   0,  -5,
+          0,   0,   0,   5,   5,   0,   0,   0,
+    ],
+    chess.QUEEN: [
+        -20, -10, -10,  -5,  -5, -10, -10, -20,
+        -10,   0,   0,   0,   0,   0,   0, -10,
+        -10,   0,   5,   5,   5,   5,   0, -10,
+         -5,   0,   5,   5,   5,   5,   0,  -5,
+          0,   0,   5,   5,   5,   5,   0,  -5,
+        -10,   5,   5,   5,   5,   5,   0, -10,
+        -10,   0,   5,   0,   0,   0,   0, -10,
+        -20, -10, -10,  -5,  -5, -10, -10, -20,
+    ],
+    chess.KING: [
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+         20,  20,   0,   0,   0,   0,  20,  20,
+         20,  30,  10,   0,   0,  10,  30,  20,
+    ],
+}
+
+def _build_square_values(material=True):
+    """
+    [color][piece_type][square]: signed centipawn worth of a piece on a
+    square (material plus table), positive for White.
+    """
+    values = {chess.WHITE: {}, chess.BLACK: {}}
+    for piece_type, table in PIECE_SQUARE_TABLES.items():
+        if not EVAL_PIECE_SQUARE:
+            table = [0] * 64
+        base = PIECE_VALUES[piece_type] * 100 if material else 0
+        values[chess.WHITE][piece_type] = [base + table[sq ^ 56] for sq in chess.SQUARES]
+        values[chess.BLACK][piece_type] = [-(base + table[sq]) for sq in chess.SQUARES]
+    return values
+
+SQUARE_VALUES = _build_square_values()
+TABLE_VALUES = _build_square_values(material=False)
+
+def _centipawns(board):
     score = 0
     for square in chess.SQUARES:
         piece = board.piece_at(square)
         if piece:
-            value = PIECE_VALUES[piece.piece_type]
-            if piece.color == chess.WHITE:
-                score += value
-            else:
-                score -= value
+            score += SQUARE_VALUES[piece.color][piece.piece_type][square]
+    return score
+
+def evaluate_board(board):
+    """Score from White's perspective. Positive = White advantage."""
+    return _centipawns(board) / 100
+
+# -----------------------------------------------------------------
+# Evaluation caches
+# -----------------------------------------------------------------
+class EvalCache:
+    """
+    Fixed-size cache of evaluation scores. Each key maps to one slot and
+    a new entry always replaces what was there. Keys are compared in
+    full, so a shared slot costs a miss, never a wrong score.
+    """
+    def __init__(self, entries):
+        self.size = max(1, entries)
+        self.clear()
+
+    def clear(self):
+        self.slots = [None] * self.size
+        self.hits = 0
+        self.misses = 0
+
+    def probe(self, key):
+        """The score stored for key, or None."""
+        entry = self.slots[hash(key) % self.size]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def store(self, key, score):
+        self.slots[hash(key) % self.size] = (key, score)
+
+    @property
+    def hit_rate(self):
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+# Pawn structure by (white pawns, black pawns): it rarely changes between
+# sibling nodes, so most leaves find theirs here
+pawn_table = EvalCache(PAWN_HASH_ENTRIES) if PAWN_HASH_ENTRIES > 0 else None
+_eval_caches = {}
+
+def get_eval_cache(evaluator):
+    """The cache of whole evaluations by Zobrist key for one evaluator, made on first use."""
+    if EVAL_CACHE_ENTRIES <= 0:
+        return None
+    if evaluator not in _eval_caches:
+        _eval_caches[evaluator] = EvalCache(EVAL_CACHE_ENTRIES)
+    return _eval_caches[evaluator]
+
+# -----------------------------------------------------------------
+# Bitboard evaluation (popcount material + mask-based terms)
+# -----------------------------------------------------------------
+PASSED_PAWN_BONUS = [0, 5, 10, 20, 35, 60, 100, 0]  # by ranks advanced
+DOUBLED_PAWN_PENALTY = 10                           # per extra pawn on a file
+ISOLATED_PAWN_PENALTY = 15
+BISHOP_PAIR_BONUS = 30
+ROOK_OPEN_FILE_BONUS = 20
+ROOK_SEMI_OPEN_FILE_BONUS = 10
+KING_SHIELD_BONUS = 10                              # per pawn in front of the king
+
+ADJACENT_FILES = [
+    (chess.BB_FILES[f - 1] if f > 0 else 0) | (chess.BB_FILES[f + 1] if f < 7 else 0)
+    for f in range(8)
+]
+
+def _ranks_ahead(color, square, distance=7):
+    """Ranks up to distance steps ahead of square from color's side."""
+    rank = chess.square_rank(square)
+    mask = 0
+    for step in range(1, distance + 1):
+        ahead = rank + step if color == chess.WHITE else rank - step
+        if 0 <= ahead < 8:
+            mask |= chess.BB_RANKS[ahead]
+    return mask
+
+def _file_and_neighbours(square):
+    file = chess.square_file(square)
+    return chess.BB_FILES[file] | ADJACENT_FILES[file]
+
+# Squares that must be free of enemy pawns for a pawn to be passed
+PASSED_MASKS = {
+    color: [_ranks_ahead(color, sq) & _file_and_neighbours(sq) for sq in chess.SQUARES]
+    for color in chess.COLORS
+}
+# Squares in front of a king where its own pawns count as a shield
+KING_SHIELD_MASKS = {
+    color: [_ranks_ahead(color, sq, 2) & _file_and_neighbours(sq) for sq in chess.SQUARES]
+    for color in chess.COLORS
+}
+
+def pawn_structure(white_pawns, black_pawns):
+    """Doubled, isolated and passed pawn terms in centipawns, positive for White."""
+    score = 0
+    for color, ours, theirs in ((chess.WHITE, white_pawns, black_pawns),
+                                (chess.BLACK, black_pawns, white_pawns)):
+        sign = 1 if color == chess.WHITE else -1
+        for file_mask in chess.BB_FILES:
+            count = (ours & file_mask).bit_count()
+            if count > 1:
+                score -= sign * DOUBLED_PAWN_PENALTY * (count - 1)
+        for square in chess.scan_forward(ours):
+            file = chess.square_file(square)
+            if not ours & ADJACENT_FILES[file]:
+                score -= sign * ISOLATED_PAWN_PENALTY
+            if not theirs & PASSED_MASKS[color][square]:
+                rank = chess.square_rank(square)
+                advanced = rank if color == chess.WHITE else 7 - rank
+                score += sign * PASSED_PAWN_BONUS[advanced]
+    return score
+
+def _piece_terms(board):
+    """Bishop pair, rooks on (semi-)open files and king pawn shield."""
+    score = 0
+    all_pawns = board.pawns
+    for color in chess.COLORS:
+        sign = 1 if color == chess.WHITE else -1
+        own_pawns = all_pawns & board.occupied_co[color]
+        if board.pieces_mask(chess.BISHOP, color).bit_count() >= 2:
+            score += sign * BISHOP_PAIR_BONUS
+        for square in chess.scan_forward(board.pieces_mask(chess.ROOK, color)):
+            file_mask = chess.BB_FILES[chess.square_file(square)]
+            if not all_pawns & file_mask:
+                score += sign * ROOK_OPEN_FILE_BONUS
+            elif not own_pawns & file_mask:
+                score += sign * ROOK_SEMI_OPEN_FILE_BONUS
+        king = board.king(color)
+        if king is not None:
+            shield = own_pawns & KING_SHIELD_MASKS[color][king]
+            score += sign * KING_SHIELD_BONUS * shield.bit_count()
+    return score
+
+def evaluate_bitboards(board, structure=EVAL_STRUCTURE, pawns=pawn_table):
+    """
+    Same scale and orientation as evaluate_board(), computed from piece
+    bitboards. With structure=False the score is identical to it.
+    pawns is the EvalCache pawn structure is looked up in, or None.
+    """
+    score = 0
+    for color in chess.COLORS:
+        sign = 1 if color == chess.WHITE else -1
+        tables = TABLE_VALUES[color]
+        for piece_type in chess.PIECE_TYPES:
+            mask = board.pieces_mask(piece_type, color)
+            score += sign * PIECE_VALUES[piece_type] * 100 * mask.bit_count()
+            if EVAL_PIECE_SQUARE:
+                table = tables[piece_type]
+                for square in chess.scan_forward(mask):
+                    score += table[square]
+    if structure:
+        white_pawns = board.pawns & board.occupied_co[chess.WHITE]
+        black_pawns = board.pawns & board.occupied_co[chess.BLACK]
+        pawn_score = None
+        if pawns is not None:
+            pawn_key = (white_pawns, black_pawns)
+            pawn_score = pawns.probe(pawn_key)
+        if pawn_score is None:
+            pawn_score = pawn_structure(white_pawns, black_pawns)
+            if pawns is not None:
+                pawns.store(pawn_key, pawn_score)
+        score += pawn_score + _piece_terms(board)
+    return score / 100
+
+# -----------------------------------------------------------------
+# Mate scores
+# -----------------------------------------------------------------
+# A mate n plies from the root scores MATE_SCORE - n for the winner, so
+# shorter mates score higher. Anything past MATE_BOUND is a mate.
+MATE_BOUND = MATE_SCORE / 2
+DRAW_SCORE = 0.0
+
+def mated_score(turn, ply):
+    """Score (White's perspective) when the side to move is mated ply plies from the root."""
+    return -(MATE_SCORE - ply) if turn == chess.WHITE else MATE_SCORE - ply
+
+def mate_in(score):
+    """Moves to mate for a mate score, positive when White mates; None otherwise."""
+    if score is None or abs(score) < MATE_BOUND:
+        return None
+    moves = (MATE_SCORE - abs(score) + 1) // 2
+    return moves if score > 0 else -moves
+
+def score_to_tt(score, ply):
+    """Mate scores count from the root; the table stores them counted from the node."""
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
     return score
 
+def score_from_tt(score, ply):
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+# -----------------------------------------------------------------
+# Transposition table
+# -----------------------------------------------------------------
+EXACT, LOWER, UPPER = 0, 1, 2
+
+class TranspositionTable:
+    """Fixed-size table of searched positions keyed by Zobrist hash.
+
+    Each bucket has two slots: a depth-preferred slot that only gives way
+    to an equal or deeper search, and an always-replace slot that takes
+    whatever the depth-preferred slot refused.
+    """
+    ENTRY_BYTES = 160  # rough CPython cost of one stored entry
+
+    def __init__(self, size_mb=TT_SIZE_MB):
+        self.size = max(1, size_mb * 1024 * 1024 // (2 * self.ENTRY_BYTES))
+        self.clear()
+
+    def clear(self):
+        self.deep = [None] * self.size
+        self.recent = [None] * self.size
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def probe(self, key):
+        """Return (key, depth, score, bound, move) for key, or None."""
+        index = key % self.size
+        deep = self.deep[index]
+        if deep is not None and deep[0] == key:
+            self.hits += 1
+            return deep
+        recent = self.recent[index]
+        if recent is not None and recent[0] == key:
+            self.hits += 1
+            return recent
+        self.misses += 1
+        if deep is not None or recent is not None:
+            self.collisions += 1
+        return None
+
+    def peek(self, key):
+        """probe() without touching the hit counters, for reporting."""
+        index = key % self.size
+        for entry in (self.deep[index], self.recent[index]):
+            if entry is not None and entry[0] == key:
+                return entry
+        return None
+
+    def store(self, key, depth, score, bound, move):
+        index = key % self.size
+        entry = (key, depth, score, bound, move)
+        deep = self.deep[index]
+        if deep is None or deep[0] == key or depth >= deep[1]:
+            self.deep[index] = entry
+        else:
+            self.recent[index] = entry
+
+transposition_table = TranspositionTable() if TT_SIZE_MB > 0 else None
+
+# -----------------------------------------------------------------
+# Static exchange evaluation
+# -----------------------------------------------------------------
+def see(pos, move):
+    """
+    Material in pawns the side to move ends up with after the exchange
+    that move starts on its target square, each side recapturing with its
+    least valuable attacker and free to stop when recapturing would lose.
+    Attackers are recomputed as pieces come off, so sliders lined up
+    behind them (x-rays) join in. Pins are ignored.
+    """
+    from_square = move & 63
+    to_square = move >> 6 & 63
+    squares = pos.squares
+    bb = pos.bb
+    occupied = pos.occupied ^ chess.BB_SQUARES[from_square]
+    if pos.is_en_passant(move):
+        victim = chess.PAWN
+        occupied ^= chess.BB_SQUARES[to_square + (-8 if pos.turn == chess.WHITE else 8)]
+    else:
+        victim = squares[to_square]
+    gains = [PIECE_VALUES[victim] if victim else 0]
+    on_square = squares[from_square]
+    if move >> 12:
+        gains[0] += PIECE_VALUES[move >> 12] - PIECE_VALUES[chess.PAWN]
+        on_square = move >> 12
+
+    side = not pos.turn
+    while True:
+        attackers = pos.attackers_mask(side, to_square, occupied)
+        if not attackers:
+            break
+        for piece_type in chess.PIECE_TYPES:
+            candidates = attackers & bb[piece_type]
+            if candidates:
+                break
+        # The king only recaptures on a square nobody else can take back
+        if piece_type == chess.KING and pos.attackers_mask(not side, to_square, occupied):
+            break
+        occupied ^= candidates & -candidates
+        gains.append(PIECE_VALUES[on_square] - gains[-1])
+        on_square = piece_type
+        side = not side
+
+    # Work back from the last capture: each side takes the better of
+    # stopping or carrying on
+    while len(gains) > 1:
+        last = gains.pop()
+        gains[-1] = -max(-gains[-1], last)
+    return gains[0]
+
+def is_losing_capture(pos, move):
+    """see(pos, move) < 0, without the exchange when the attacker is worth no more than its victim."""
+    attacker = pos.squares[move & 63]
+    victim = pos.squares[move >> 6 & 63] or chess.PAWN
+    if PIECE_VALUES[attacker] <= PIECE_VALUES[victim] or move >> 12:
+        return False
+    return see(pos, move) < 0
+
+# -----------------------------------------------------------------
+# Move ordering
+# -----------------------------------------------------------------
+class MoveOrderer:
+    """
+    Sorts a SearchBoard's moves so alpha-beta meets its cutoffs early:
+    TT/PV move, captures by MVV-LVA, promotions, two killer moves per ply,
+    quiet moves by history score, then (with see) captures that lose
+    material by static exchange.
+    """
+    TT_MOVE = 1 << 30
+    CAPTURE = 1 << 28
+    PROMOTION = 1 << 27
+    KILLERS = (1 << 26, 1 << 25)
+    LOSING_CAPTURE = -(1 << 24)
+
+    def __init__(self, see=True):
+        self.see = see
+        self.killers = []
+        self.history = [0] * (2 * 64 * 64)
+
+    def score(self, board, move, ply, tt_move=None):
+        if move == tt_move:
+            return self.TT_MOVE
+        score = 0
+        victim = board.squares[move >> 6 & 63]
+        if not victim and board.is_en_passant(move):
+            victim = chess.PAWN
+        if victim:
+            attacker = board.squares[move & 63]
+            mvv_lva = PIECE_VALUES[victim] * 16 - PIECE_VALUES[attacker]
+            if self.see and is_losing_capture(board, move):
+                return self.LOSING_CAPTURE + mvv_lva
+            score += self.CAPTURE + mvv_lva
+        if move >> 12:
+            score += self.PROMOTION + PIECE_VALUES[move >> 12]
+        if score:
+            return score
+        if ply < len(self.killers):
+            killers = self.killers[ply]
+            if move == killers[0]:
+                return self.KILLERS[0]
+            if move == killers[1]:
+                return self.KILLERS[1]
+        return self.history[board.turn * 4096 + (move & 4095)]
+
+    def order(self, board, moves, ply, tt_move=None):
+        return sorted(moves, key=lambda move: self.score(board, move, ply, tt_move),
+                      reverse=True)
+
+    def record_cutoff(self, board, move, ply, depth):
+        """Remember a quiet move that caused a beta cutoff at this ply."""
+        if board.is_capture(move) or move >> 12:
+            return
+        while len(self.killers) <= ply:
+            self.killers.append([None, None])
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[board.turn * 4096 + (move & 4095)] += depth * depth
+
+class SearchTimeout(Exception):
+    """Raised from inside the search once the deadline passes or stop is set."""
+
+class SearchContext:
+    """
+    State shared by the recursive search functions for one engine call.
+    The search itself runs on a SearchBoard made from board by position().
+    """
+    def __init__(self, board, tt=transposition_table, deadline=None, ordering=True,
+                 quiescence=True, evaluator=EVALUATOR, stop=None, see=True, eval_cache=True,
+                 node_limit=None):
+        self.tt = tt
+        self.orderer = MoveOrderer(see) if ordering else None
+        self.quiescence = quiescence
+        self.see = see  # static exchange: order, prune and skip losing captures
+        self.incremental = evaluator == "incremental"
+        self.eval_fn = evaluate_bitboards if evaluator == "bitboard" else evaluate_board
+        # The incremental score costs nothing to read; the others are cached
+        self.eval_cache = None
+        if eval_cache and not self.incremental:
+            self.eval_cache = get_eval_cache(evaluator)
+        elif evaluator == "bitboard":
+            self.eval_fn = lambda board: evaluate_bitboards(board, pawns=None)
+        self.root_ply = board.ply()
+        self.deadline = deadline
+        self.stop = stop  # threading/multiprocessing Event that aborts the search
+        self.node_limit = node_limit  # nodes + qnodes; checked with the clock
+        self.started = time.perf_counter()
+        self.tt_hits_at_start = tt.hits if tt is not None else 0
+        self.pool_tt_hits = 0  # hits in the parallel search workers' own tables
+        self.nodes = 0
+        self.qnodes = 0
+        self.generations = 0  # move lists generated; about one per expanded node
+        self.qnode_limit = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.max_ply = 0
+        self.depth = 0       # deepest completed root search
+        self.score = None    # its score, White's perspective
+
+    @property
+    def tt_hits(self):
+        hits = self.tt.hits - self.tt_hits_at_start if self.tt is not None else 0
+        return hits + self.pool_tt_hits
+
+    def count_node(self, quiescence=False):
+        if quiescence:
+            self.qnodes += 1
+        else:
+            self.nodes += 1
+        if (self.nodes + self.qnodes) % 1024 == 0:
+            if self.deadline is not None and time.perf_counter() >= self.deadline:
+                raise SearchTimeout
+            if self.stop is not None and self.stop.is_set():
+                raise SearchTimeout
+            if self.node_limit is not None and self.nodes + self.qnodes >= self.node_limit:
+                raise SearchTimeout
+
+    def record_cutoff(self, board, move, ply, depth, index):
+        """Count a beta cutoff by the index-th move tried and feed the orderer."""
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        if self.orderer is not None:
+            self.orderer.record_cutoff(board, move, ply, depth)
+
+    def evaluate(self, board):
+        """Static score of a SearchBoard; the incremental one is kept by make/unmake."""
+        if not self.incremental:
+            cache = self.eval_cache
+            if cache is None:
+                return self.eval_fn(board)
+            score = cache.probe(board.key)
+            if score is None:
+                score = self.eval_fn(board)
+                cache.store(board.key, score)
+            elif EVAL_DEBUG:
+                assert score == self.eval_fn(board), (board.fen(), score)
+            return score
+        if EVAL_DEBUG:
+            assert board.score == _centipawns(board), (board.fen(), board.score)
+        return board.score / 100
+
+def position(board):
+    """SearchBoard for a chess.Board, for the search functions below."""
+    return SearchBoard.from_board(board, SQUARE_VALUES)
+
+def predict_reply(board):
+    """Best move stored for this position by earlier searches, if any."""
+    if transposition_table is None:
+        return None
+    entry = transposition_table.probe(chess.polyglot.zobrist_hash(board))
+    if entry is not None and entry[4] is not None:
+        move = to_move(entry[4])
+        if board.is_legal(move):
+            return move
+    return None
+
 # -----------------------------------------------------------------
 # Random move (fallback)
 # -----------------------------------------------------------------
@@ -30,11 +596,13 @@ def get_random_move(board):
 # -----------------------------------------------------------------
 # Greedy (depth 1)
 # -----------------------------------------------------------------
-def get_greedy_move(board):
+def get_greedy_move(board, ctx=None):
     best_move = None
     if board.turn == chess.WHITE:
         best_score = -float('inf')
         for move in board.legal_moves:
+            if ctx is not None:
+                ctx.count_node()
             board.push(move)
             score = evaluate_board(board)
             board.pop()
@@ -44,104 +612,726 @@ def get_greedy_move(board):
     else:
         best_score = float('inf')
         for move in board.legal_moves:
+            if ctx is not None:
+                ctx.count_node()
             board.push(move)
             score = evaluate_board(board)
             board.pop()
             if score < best_score:
                 best_score = score
                 best_move = move
+    if ctx is not None:
+        ctx.score, ctx.depth, ctx.max_ply = best_score, 1, 1
     return best_move
 
+# -----------------------------------------------------------------
+# Node expansion
+# -----------------------------------------------------------------
+def expand(pos, ply, ctx):
+    """
+    Generate pos's legal moves once and use them to spot the end of the
+    game. Returns (moves, None) to search on, or (None, score) for mate,
+    stalemate or the fifty-move rule below the root (at the root the draw
+    is only claimable, so a move is still wanted). Repetition and
+    insufficient material need no moves and are tested before this
+    (SearchBoard.is_draw).
+    """
+    moves = pos.legal_moves()
+    ctx.generations += 1
+    if not moves:
+        if pos.is_check():
+            return None, mated_score(pos.turn, ply)
+        return None, DRAW_SCORE
+    if ply and pos.halfmove_clock >= 100:
+        return None, DRAW_SCORE
+    return moves, None
+
 # -----------------------------------------------------------------
 # Minimax (fixed depth)
 # -----------------------------------------------------------------
-def minimax(board, depth, maximizing):
-    if depth == 0 or board.is_game_over():
-        return evaluate_board(board), None
+def minimax(pos, depth, maximizing, ctx):
+    ctx.count_node()
+    ply = pos.ply_count - ctx.root_ply
+    ctx.max_ply = max(ctx.max_ply, ply)
+    if ply and pos.is_draw(ply):
+        return DRAW_SCORE, None
+    if depth == 0:
+        return ctx.evaluate(pos), None
+
+    key = None
+    if ctx.tt is not None:
+        key = pos.key
+        entry = ctx.tt.probe(key)
+        if entry is not None and entry[1] >= depth and entry[3] == EXACT and ply > 0:
+            return score_from_tt(entry[2], ply), entry[4]
+
+    moves, score = expand(pos, ply, ctx)
+    if moves is None:
+        return score, None
 
     best_move = None
     if maximizing:
         best_score = -float('inf')
-        for move in board.legal_moves:
-            board.push(move)
-            score, _ = minimax(board, depth-1, False)
-            board.pop()
+        for move in moves:
+            pos.make(move)
+            score, _ = minimax(pos, depth-1, False, ctx)
+            pos.unmake()
             if score > best_score:
                 best_score = score
                 best_move = move
-        return best_score, best_move
     else:
         best_score = float('inf')
-        for move in board.legal_moves:
-            board.push(move)
-            score, _ = minimax(board, depth-1, True)
-            board.pop()
+        for move in moves:
+            pos.make(move)
+            score, _ = minimax(pos, depth-1, True, ctx)
+            pos.unmake()
             if score < best_score:
                 best_score = score
                 best_move = move
-        return best_score, best_move
 
-def get_minimax_move(board, depth):
+    if key is not None:
+        ctx.tt.store(key, depth, score_to_tt(best_score, ply), EXACT, best_move)
+    return best_score, best_move
+
+def get_minimax_move(board, depth, ctx=None):
+    if ctx is None:
+        ctx = SearchContext(board)
     maximizing = (board.turn == chess.WHITE)
-    _, move = minimax(board, depth, maximizing)
-    return move
+    ctx.score, move = minimax(position(board), depth, maximizing, ctx)
+    ctx.depth = depth
+    return to_move(move) if move is not None else None
 
 # -----------------------------------------------------------------
 # Alpha‑Beta (pruned minimax)
 # -----------------------------------------------------------------
-def alphabeta(board, depth, alpha, beta, maximizing):
-    if depth == 0 or board.is_game_over():
-        return evaluate_board(board), None
+def alphabeta(pos, depth, alpha, beta, maximizing, ctx):
+    ctx.count_node()
+    ply = pos.ply_count - ctx.root_ply
+    if ply and pos.is_draw(ply):
+        return DRAW_SCORE, None
+
+    # Scores are from White's perspective on both sides, so bounds are too:
+    # LOWER means the true score is at least the stored one, UPPER at most.
+    key = None
+    tt_move = None
+    alpha_orig, beta_orig = alpha, beta
+    if ctx.tt is not None and depth > 0:
+        key = pos.key
+        entry = ctx.tt.probe(key)
+        if entry is not None:
+            tt_move = entry[4]
+        if entry is not None and entry[1] >= depth and ply > 0:
+            tt_score, tt_bound = score_from_tt(entry[2], ply), entry[3]
+            if tt_bound == EXACT:
+                return tt_score, tt_move
+            elif tt_bound == LOWER:
+                alpha = max(alpha, tt_score)
+            else:
+                beta = min(beta, tt_score)
+            if beta <= alpha:
+                return tt_score, tt_move
+
+    moves, score = expand(pos, ply, ctx)
+    if moves is None:
+        return score, None
+    if depth == 0:
+        if ctx.quiescence:
+            ctx.qnode_limit = ctx.qnodes + QS_NODE_LIMIT
+            return quiescence(pos, alpha, beta, maximizing, ctx, moves), None
+        return ctx.evaluate(pos), None
+
+    ctx.max_ply = max(ctx.max_ply, ply)
+    if ctx.orderer is not None:
+        moves = ctx.orderer.order(pos, moves, ply, tt_move)
+    # Next to the horizon a capture that loses material by static exchange
+    # is not worth searching; the first move always is
+    prune_captures = ctx.see and depth <= SEE_PRUNE_DEPTH and not pos.is_check()
 
     best_move = None
     if maximizing:
         best_score = -float('inf')
-        for move in board.legal_moves:
-            board.push(move)
-            score, _ = alphabeta(board, depth-1, alpha, beta, False)
-            board.pop()
+        for index, move in enumerate(moves):
+            if (index and prune_captures and pos.squares[move >> 6 & 63]
+                    and is_losing_capture(pos, move)):
+                continue
+            pos.make(move)
+            score, _ = alphabeta(pos, depth-1, alpha, beta, False, ctx)
+            pos.unmake()
             if score > best_score:
                 best_score = score
                 best_move = move
             alpha = max(alpha, best_score)
             if beta <= alpha:
+                ctx.record_cutoff(pos, move, ply, depth, index)
                 break
-        return best_score, best_move
     else:
         best_score = float('inf')
-        for move in board.legal_moves:
-            board.push(move)
-            score, _ = alphabeta(board, depth-1, alpha, beta, True)
-            board.pop()
+        for index, move in enumerate(moves):
+            if (index and prune_captures and pos.squares[move >> 6 & 63]
+                    and is_losing_capture(pos, move)):
+                continue
+            pos.make(move)
+            score, _ = alphabeta(pos, depth-1, alpha, beta, True, ctx)
+            pos.unmake()
             if score < best_score:
                 best_score = score
                 best_move = move
             beta = min(beta, best_score)
             if beta <= alpha:
+                ctx.record_cutoff(pos, move, ply, depth, index)
                 break
-        return best_score, best_move
 
-def get_alphabeta_move(board, depth):
+    if key is not None:
+        if best_score <= alpha_orig:
+            bound = UPPER
+        elif best_score >= beta_orig:
+            bound = LOWER
+        else:
+            bound = EXACT
+        ctx.tt.store(key, depth, score_to_tt(best_score, ply), bound, best_move)
+    return best_score, best_move
+
+def get_alphabeta_move(board, depth, ctx=None):
+    if ctx is None:
+        ctx = SearchContext(board)
+    maximizing = (board.turn == chess.WHITE)
+    ctx.score, move = alphabeta(position(board), depth, -float('inf'), float('inf'),
+                                maximizing, ctx)
+    ctx.depth = depth
+    return to_move(move) if move is not None else None
+
+# -----------------------------------------------------------------
+# Principal variation search (negamax with null move, LMR, extensions)
+# -----------------------------------------------------------------
+# Scores here are from the side to move's point of view. Every score is a
+# whole number of centipawns, so a window this narrow only asks "better
+# than alpha or not?".
+NULL_WINDOW = 0.001
+
+def _flip_bound(bound):
+    return bound if bound == EXACT else LOWER + UPPER - bound
+
+def _negamax(pos, depth, alpha, beta, ctx, null_ok=True):
+    ctx.count_node()
+    ply = pos.ply_count - ctx.root_ply
+    if ply and pos.is_draw(ply):
+        return DRAW_SCORE, None
+    sign = 1 if pos.turn == chess.WHITE else -1
+    in_check = pos.is_check()
+    if in_check and ply < 2 * MAX_SEARCH_DEPTH:
+        depth += 1  # check extension: never stop the search on a checked king
+
+    # The table holds White-perspective scores and bounds, shared with alphabeta()
+    key = None
+    tt_move = None
+    alpha_orig = alpha
+    if ctx.tt is not None and depth > 0:
+        key = pos.key
+        entry = ctx.tt.probe(key)
+        if entry is not None:
+            tt_move = entry[4]
+        if entry is not None and entry[1] >= depth and ply > 0:
+            tt_score = sign * score_from_tt(entry[2], ply)
+            tt_bound = entry[3] if sign > 0 else _flip_bound(entry[3])
+            if (tt_bound == EXACT or (tt_bound == LOWER and tt_score >= beta)
+                    or (tt_bound == UPPER and tt_score <= alpha)):
+                return tt_score, tt_move
+
+    moves, score = expand(pos, ply, ctx)
+    if moves is None:
+        return sign * score, None
+    if depth <= 0:
+        if ctx.quiescence:
+            ctx.qnode_limit = ctx.qnodes + QS_NODE_LIMIT
+            if sign > 0:
+                return quiescence(pos, alpha, beta, True, ctx, moves), None
+            return -quiescence(pos, -beta, -alpha, False, ctx, moves), None
+        return sign * ctx.evaluate(pos), None
+
+    ctx.max_ply = max(ctx.max_ply, ply)
+    pv_node = beta - alpha > NULL_WINDOW
+
+    # Null move: if passing still fails high, a real move would too. Not in
+    # check, not twice in a row, and not with only pawns left, where being
+    # forced to move (zugzwang) is common.
+    if (null_ok and not pv_node and not in_check and depth >= NULL_MOVE_MIN_DEPTH
+            and pos.occupied_co[pos.turn] & ~(pos.pawns | pos.kings)
+            and sign * ctx.evaluate(pos) >= beta):
+        pos.make_null()
+        score = -_negamax(pos, depth - 1 - NULL_MOVE_REDUCTION, -beta, -beta + NULL_WINDOW,
+                          ctx, False)[0]
+        pos.unmake_null()
+        if score >= beta:
+            # A mate found after passing proves nothing about the real moves
+            return (beta if score >= MATE_BOUND else score), None
+
+    if ctx.orderer is not None:
+        moves = ctx.orderer.order(pos, moves, ply, tt_move)
+    prune_captures = ctx.see and depth <= SEE_PRUNE_DEPTH and not pv_node and not in_check
+
+    best_score = -float('inf')
+    best_move = None
+    for index, move in enumerate(moves):
+        if (index and prune_captures and pos.squares[move >> 6 & 63]
+                and is_losing_capture(pos, move)):
+            continue
+        quiet = not move >> 12 and not pos.is_capture(move)
+        pos.make(move)
+        if index == 0:
+            score = -_negamax(pos, depth - 1, -beta, -alpha, ctx)[0]
+        else:
+            # Late quiet moves are searched a ply shallower; anything that
+            # then beats alpha is searched again at full depth
+            reduction = 0
+            if (quiet and index >= LMR_FULL_MOVES and depth >= LMR_MIN_DEPTH
+                    and not in_check and not pos.is_check()):
+                reduction = 1
+            score = -_negamax(pos, depth - 1 - reduction, -alpha - NULL_WINDOW, -alpha, ctx)[0]
+            if score > alpha and reduction:
+                score = -_negamax(pos, depth - 1, -alpha - NULL_WINDOW, -alpha, ctx)[0]
+            if alpha < score < beta:
+                score = -_negamax(pos, depth - 1, -beta, -alpha, ctx)[0]
+        pos.unmake()
+        if score > best_score:
+            best_score = score
+            best_move = move
+        alpha = max(alpha, score)
+        if alpha >= beta:
+            ctx.record_cutoff(pos, move, ply, depth, index)
+            break
+
+    if key is not None:
+        if best_score <= alpha_orig:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        if sign < 0:
+            bound = _flip_bound(bound)
+        ctx.tt.store(key, depth, score_to_tt(sign * best_score, ply), bound, best_move)
+    return best_score, best_move
+
+def pvs(pos, depth, alpha, beta, maximizing, ctx):
+    """
+    Principal variation search behind alphabeta()'s interface: window and
+    score from White's perspective. Only the first move at each node gets
+    the full window; the rest are proved worse with a null window and
+    searched again only if that fails.
+    """
+    if maximizing:
+        return _negamax(pos, depth, alpha, beta, ctx)
+    score, move = _negamax(pos, depth, -beta, -alpha, ctx)
+    return -score, move
+
+def get_pvs_move(board, depth, ctx=None):
+    if ctx is None:
+        ctx = SearchContext(board)
     maximizing = (board.turn == chess.WHITE)
-    _, move = alphabeta(board, depth, -float('inf'), float('inf'), maximizing)
-    return move
+    ctx.score, move = pvs(position(board), depth, -float('inf'), float('inf'), maximizing, ctx)
+    ctx.depth = depth
+    return to_move(move) if move is not None else None
+
+# Searches with the alphabeta() signature, for iterative deepening and the pool
+SEARCHES = {"alphabeta": alphabeta, "pvs": pvs}
+
+# -----------------------------------------------------------------
+# Root-parallel alpha-beta (process pool)
+# -----------------------------------------------------------------
+_search_pool = None
+_search_pool_workers = 0
+_search_pool_stop = None  # Event shared with the pool; aborts the tasks running in it
+_worker_stop = None       # the same Event, as seen inside a pool worker
+
+def _init_search_worker(stop_event):
+    global _worker_stop
+    _worker_stop = stop_event
+
+def get_search_pool(workers=SEARCH_WORKERS):
+    """Process pool for parallel search, kept alive between moves."""
+    global _search_pool, _search_pool_workers, _search_pool_stop
+    if _search_pool is None or _search_pool_workers != workers:
+        shutdown_search_pool()
+        mp_context = multiprocessing.get_context("spawn")
+        _search_pool_stop = mp_context.Event()
+        _search_pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=mp_context,
+            initializer=_init_search_worker, initargs=(_search_pool_stop,)
+        )
+        _search_pool_workers = workers
+    return _search_pool
+
+def shutdown_search_pool():
+    global _search_pool
+    if _search_pool is not None:
+        _search_pool.shutdown(wait=True, cancel_futures=True)
+        _search_pool = None
+
+def search_root_move(fen, moves, move, depth, alpha, beta, algorithm="alphabeta", options=None):
+    """
+    Pool task: rebuild the game from its start FEN and UCI moves, play one
+    root move and search the reply with the caller's SearchContext options.
+    Returns (score, counters), counters as read by _add_counters().
+    """
+    board = chess.Board(fen)
+    for uci in moves:
+        board.push_uci(uci)
+    board.push_uci(move)
+    ctx = SearchContext(board, stop=_worker_stop, **(options or {}))
+    # Count plies from the real root, so mate distances match a serial search
+    ctx.root_ply -= 1
+    search = SEARCHES[algorithm]
+    score, _ = search(position(board), depth - 1, alpha, beta, board.turn == chess.WHITE, ctx)
+    return score, (ctx.nodes, ctx.qnodes, ctx.generations, ctx.cutoffs,
+                   ctx.first_move_cutoffs, ctx.tt_hits, ctx.max_ply)
+
+def _add_counters(ctx, counters):
+    """Fold a pool task's counters into the root context."""
+    nodes, qnodes, generations, cutoffs, first_move_cutoffs, tt_hits, max_ply = counters
+    ctx.nodes += nodes
+    ctx.qnodes += qnodes
+    ctx.generations += generations
+    ctx.cutoffs += cutoffs
+    ctx.first_move_cutoffs += first_move_cutoffs
+    ctx.pool_tt_hits += tt_hits
+    ctx.max_ply = max(ctx.max_ply, max_ply)
+
+def _completed(futures, stop):
+    """
+    Yield futures as they finish. On stop, cancel the pending ones and
+    stop the running ones through the pool's shared flag, which is
+    cleared again once they have ended, so the next search starts clean.
+    """
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+        yield from done
+        if stop is not None and stop.is_set():
+            for future in pending:
+                future.cancel()
+            _search_pool_stop.set()
+            wait(pending)
+            _search_pool_stop.clear()
+            raise SearchTimeout
+
+def get_parallel_move(board, depth, workers=SEARCH_WORKERS, ctx=None, algorithm="alphabeta",
+                      options=None):
+    """
+    Root splitting: the first move in search order is searched alone to get
+    a score, then every other root move is searched in parallel against that
+    bound, so moves that cannot beat it fail low cheaply. Each worker keeps
+    its own transposition table between tasks.
+    options are the SearchContext options ctx was made with; every task is
+    searched with them. Tables cannot cross processes, so tt may only be
+    None or the default table (the workers then use their own).
+    """
+    options = dict(options or {})
+    if "tt" in options:
+        if options["tt"] is transposition_table:
+            del options["tt"]
+        elif options["tt"] is not None:
+            raise ValueError("parallel search cannot use a private transposition table; "
+                             "search serially (parallel=False) instead")
+    if ctx is None:
+        ctx = SearchContext(board, **options)
+    pos = position(board)
+    moves = [to_move(move) for move in MoveOrderer(ctx.see).order(pos, pos.legal_moves(), 0)]
+    if depth < 2 or len(moves) < 2:
+        return run_algorithm(board, algorithm, depth, ctx)
+
+    pool = get_search_pool(workers)
+    fen = board.root().fen()
+    stack = [move.uci() for move in board.move_stack]
+    maximizing = (board.turn == chess.WHITE)
+    inf = float('inf')
+
+    def submit(move, alpha, beta):
+        return pool.submit(search_root_move, fen, stack, move.uci(), depth, alpha, beta,
+                           algorithm, options)
+
+    first = submit(moves[0], -inf, inf)
+    for future in _completed([first], ctx.stop):
+        best_score, counters = future.result()
+    _add_counters(ctx, counters)
+
+    # Only scores strictly better than the first move's are exact; the rest
+    # fail low and are ignored.
+    window = (best_score, inf) if maximizing else (-inf, best_score)
+    futures = {submit(move, *window): index for index, move in enumerate(moves) if index}
+    scores = {0: best_score}
+    for future in _completed(futures, ctx.stop):
+        score, counters = future.result()
+        scores[futures[future]] = score
+        _add_counters(ctx, counters)
+
+    sign = 1 if maximizing else -1
+    best = max(sorted(scores), key=lambda index: sign * scores[index])
+    ctx.score, ctx.depth = scores[best], depth
+    return moves[best]
+
+# -----------------------------------------------------------------
+# Quiescence (captures and promotions only, below alpha-beta leaves)
+# -----------------------------------------------------------------
+def material_gain(pos, move):
+    """Material a capture/promotion wins before any recapture."""
+    if pos.is_en_passant(move):
+        gain = PIECE_VALUES[chess.PAWN]
+    else:
+        victim = pos.squares[move >> 6 & 63]
+        gain = PIECE_VALUES[victim] if victim else 0
+    if move >> 12:
+        gain += PIECE_VALUES[move >> 12] - PIECE_VALUES[chess.PAWN]
+    return gain
+
+def quiescence(pos, alpha, beta, maximizing, ctx, moves=None):
+    """
+    Resolve captures and promotions until the position is quiet, so leaves
+    are not scored in the middle of an exchange. The side to move may
+    always "stand pat" on the static evaluation instead of capturing.
+    moves, if the caller already generated them, saves generating again.
+    """
+    ctx.count_node(quiescence=True)
+    stand_pat = ctx.evaluate(pos)
+    if ctx.qnodes >= ctx.qnode_limit:
+        return stand_pat
+
+    if maximizing:
+        if stand_pat >= beta:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+    else:
+        if stand_pat <= alpha:
+            return stand_pat
+        beta = min(beta, stand_pat)
+
+    ply = pos.ply_count - ctx.root_ply
+    ctx.max_ply = max(ctx.max_ply, ply)
+    if moves is None:
+        ctx.generations += 1
+    moves = pos.tactical_moves(moves)
+    if ctx.orderer is not None:
+        moves = ctx.orderer.order(pos, moves, ply)
+
+    best_score = stand_pat
+    for move in moves:
+        # Delta pruning: even winning this material cleanly cannot reach the window
+        gain = material_gain(pos, move) + DELTA_MARGIN
+        if maximizing and stand_pat + gain <= alpha:
+            continue
+        if not maximizing and stand_pat - gain >= beta:
+            continue
+        # Nor can a capture that loses material once the exchange plays out
+        if ctx.see and is_losing_capture(pos, move):
+            continue
+        pos.make(move)
+        score = quiescence(pos, alpha, beta, not maximizing, ctx)
+        pos.unmake()
+        if maximizing:
+            best_score = max(best_score, score)
+            alpha = max(alpha, score)
+        else:
+            best_score = min(best_score, score)
+            beta = min(beta, score)
+        if beta <= alpha:
+            break
+    return best_score
+
+# -----------------------------------------------------------------
+# Iterative deepening (time budget)
+# -----------------------------------------------------------------
+def aspiration_search(pos, depth, guess, maximizing, ctx, search=alphabeta):
+    """search (one of SEARCHES) in a narrow window around guess, widened on failure."""
+    if guess is None:
+        return search(pos, depth, -float('inf'), float('inf'), maximizing, ctx)
+    alpha = guess - ASPIRATION_WINDOW
+    beta = guess + ASPIRATION_WINDOW
+    while True:
+        score, move = search(pos, depth, alpha, beta, maximizing, ctx)
+        if score <= alpha:
+            alpha = -float('inf')
+        elif score >= beta:
+            beta = float('inf')
+        else:
+            return score, move
+
+def get_timed_move(board, time_ms, max_depth=MAX_SEARCH_DEPTH, ctx=None, report=None,
+                   algorithm=SEARCH_ALGORITHM):
+    """
+    Deepen one ply at a time until time_ms runs out and return the move of
+    the last completed iteration. Depth 1 always completes so there is
+    always a move to play. report(ctx, move), if given, is called after
+    every completed iteration. algorithm names one of SEARCHES.
+    """
+    if ctx is None:
+        ctx = SearchContext(board)
+    maximizing = (board.turn == chess.WHITE)
+    deadline = time.perf_counter() + time_ms / 1000.0
+
+    pos = position(board)
+    best_move, score = None, None
+    for depth in range(1, max_depth + 1):
+        try:
+            score, move = aspiration_search(pos, depth, score, maximizing, ctx,
+                                            SEARCHES[algorithm])
+        except SearchTimeout:
+            break
+        if move is None:
+            break
+        best_move = move = to_move(move)
+        ctx.score, ctx.depth = score, depth
+        if report is not None:
+            report(ctx, move)
+        ctx.deadline = deadline
+        if time.perf_counter() >= deadline:
+            break
+    return best_move
+
+# -----------------------------------------------------------------
+# Search statistics
+# -----------------------------------------------------------------
+def principal_variation(board, first_move, tt=transposition_table, max_length=MAX_SEARCH_DEPTH):
+    """
+    The expected line starting with first_move, followed through the best
+    moves the transposition table holds. Stops at a missing or illegal
+    entry, or when a position repeats.
+    """
+    line = []
+    if first_move is None:
+        return line
+    board = board.copy(stack=False)
+    seen = set()
+    move = first_move
+    while move is not None and len(line) < max_length:
+        line.append(move)
+        board.push(move)
+        key = chess.polyglot.zobrist_hash(board)
+        if key in seen or tt is None:
+            break
+        seen.add(key)
+        entry = tt.peek(key)
+        move = to_move(entry[4]) if entry is not None and entry[4] is not None else None
+        if move is not None and not board.is_legal(move):
+            break
+    return line
+
+class SearchStats:
+    """
+    What one engine call did: the move, how it was found and what it cost.
+    Built from the SearchContext after the search, so the hot loop only
+    bumps integers.
+    """
+    def __init__(self, board, algorithm, move=None, ctx=None):
+        self.fen = board.fen()
+        self.algorithm = algorithm
+        self.move = move.uci() if move else None
+        self.depth = 0
+        self.score = None
+        self.nodes = self.qnodes = 0
+        self.cutoffs = self.first_move_cutoffs = 0
+        self.tt_hits = 0
+        self.max_ply = 0
+        self.elapsed = 0.0
+        self.pv = [self.move] if self.move else []
+        if ctx is not None:
+            self.depth = ctx.depth
+            self.score = ctx.score
+            self.nodes, self.qnodes = ctx.nodes, ctx.qnodes
+            self.cutoffs, self.first_move_cutoffs = ctx.cutoffs, ctx.first_move_cutoffs
+            self.tt_hits = ctx.tt_hits
+            self.max_ply = ctx.max_ply
+            self.elapsed = time.perf_counter() - ctx.started
+            self.pv = [m.uci() for m in principal_variation(board, move, ctx.tt, max(ctx.depth, 1))]
+
+    @property
+    def nps(self):
+        return (self.nodes + self.qnodes) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def first_move_cutoff_rate(self):
+        """Share of beta cutoffs made by the first move tried; near 1 means good ordering."""
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def to_dict(self):
+        return {
+            "fen": self.fen, "move": self.move, "algorithm": self.algorithm,
+            "depth": self.depth, "score": self.score, "mate": mate_in(self.score),
+            "nodes": self.nodes,
+            "qnodes": self.qnodes, "nps": round(self.nps), "cutoffs": self.cutoffs,
+            "first_move_cutoff_rate": round(self.first_move_cutoff_rate, 3),
+            "tt_hits": self.tt_hits, "max_ply": self.max_ply,
+            "elapsed": round(self.elapsed, 4), "pv": self.pv,
+        }
 
 # -----------------------------------------------------------------
 # Unified AI move selector (depth‑aware)
 # -----------------------------------------------------------------
-def get_ai_move(board, depth):
+ALGORITHMS = ("random", "greedy", "minimax", "alphabeta", "pvs")
+
+def algorithm_for_depth(depth):
     """
-    Choose AI move based on search depth:
     - depth <= 0: random
     - depth == 1: greedy
     - depth == 2: minimax
-    - depth >= 3: alpha‑beta
+    - depth >= 3: SEARCH_ALGORITHM (alpha‑beta or PVS)
     """
     if depth <= 0:
-        return get_random_move(board)
+        return "random"
     elif depth == 1:
-        return get_greedy_move(board)
+        return "greedy"
     elif depth == 2:
-        return get_minimax_move(board, depth)
-    else:
-        return get_alphabeta_move(board, depth)
\ No newline at end of file
+        return "minimax"
+    return SEARCH_ALGORITHM
+
+def run_algorithm(board, algorithm, depth, ctx):
+    """Fixed-depth move from one of ALGORITHMS, counting nodes in ctx."""
+    if algorithm == "random":
+        return get_random_move(board)
+    elif algorithm == "greedy":
+        return get_greedy_move(board, ctx)
+    elif algorithm == "minimax":
+        return get_minimax_move(board, depth, ctx)
+    elif algorithm == "alphabeta":
+        return get_alphabeta_move(board, depth, ctx)
+    elif algorithm == "pvs":
+        return get_pvs_move(board, depth, ctx)
+    raise ValueError(f"Unknown algorithm: {algorithm}")
+
+def search_move(board, depth, move_time=0, stop=None, book=True, algorithm=None, parallel=True,
+                **options):
+    """
+    Play from the opening book while in it, otherwise search with
+    algorithm (one of ALGORITHMS; default: what algorithm_for_depth()
+    picks), deepened until move_time ms have passed if move_time > 0.
+    Timed search is always alpha‑beta or PVS, SEARCH_ALGORITHM unless one
+    of them is asked for. Random play (depth <= 0) never uses the book,
+    and alpha‑beta and PVS run root-parallel when SEARCH_WORKERS > 1
+    unless parallel=False.
+    Setting the optional stop event aborts a fixed-depth search (returning
+    None) or ends a timed one early. book=False skips the opening book, and
+    other options (tt, evaluator, quiescence, ordering, see) go to SearchContext.
+    Returns (move, SearchStats).
+    """
+    algorithm = algorithm or algorithm_for_depth(depth)
+    if move_time > 0 and algorithm not in SEARCHES:
+        algorithm = SEARCH_ALGORITHM
+    if algorithm == "random":
+        return get_random_move(board), SearchStats(board, "random")
+    move = book_move(board) if book else None
+    if move is not None:
+        return move, SearchStats(board, "book", move=move)
+
+    ctx = SearchContext(board, stop=stop, **options)
+    try:
+        if move_time > 0:
+            move = get_timed_move(board, move_time, ctx=ctx, algorithm=algorithm)
+        elif algorithm in SEARCHES and SEARCH_WORKERS > 1 and parallel:
+            move = get_parallel_move(board, depth, ctx=ctx, algorithm=algorithm, options=options)
+        else:
+            move = run_algorithm(board, algorithm, depth, ctx)
+    except SearchTimeout:
+        move = None
+    return move, SearchStats(board, algorithm, move, ctx)
+
+def get_ai_move(board, depth, move_time=0, stop=None, algorithm=None):
+    """search_move() without the statistics."""
+    return search_move(board, depth, move_time, stop, algorithm=algorithm)[0]
@@ -0,0 +1,282 @@
+"""
+Headless batch analysis of PGN archives across a process pool. Never
+imports pygame.
+
+    python -m src.analyze games.pgn --out analysis.csv --depth 4
+    python -m src.analyze big.pgn --out analysis.jsonl --movetime 200 --workers 4
+    python -m src.analyze big.pgn --out analysis.jsonl --resume
+
+Games are read one at a time, so memory stays flat however large the
+file is. Every position is searched in a worker; rows are written game by
+game, in file order, as soon as a game's positions are done. Each row
+carries the byte offset of its game, so --resume can pick up after the
+last finished game.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import chess
+import chess.pgn
+from settings import (
+    ANALYSIS_DEPTH, ANALYSIS_TT_SIZE_MB, ANALYSIS_CHUNK, ANALYSIS_QUEUE, ANALYSIS_SCORE_CAP,
+    ANALYSIS_MISTAKE, ANALYSIS_BLUNDER
+)
+from src.ai import SearchContext, TranspositionTable, get_alphabeta_move, get_timed_move
+
+FIELDS = ["game", "offset", "white", "black", "ply", "move", "best", "score",
+          "played_score", "loss", "flag"]
+
+# -----------------------------------------------------------------
+# Positions (run in a pool worker)
+# -----------------------------------------------------------------
+_table = None
+
+def _worker_table():
+    """This worker's transposition table, allocated once per process."""
+    global _table
+    if _table is None:
+        _table = TranspositionTable(ANALYSIS_TT_SIZE_MB)
+    return _table
+
+def terminal_score(board):
+    """Score of a finished game, or None if it is not over."""
+    outcome = board.outcome()
+    if outcome is None:
+        return None
+    if outcome.winner is None:
+        return 0.0
+    return ANALYSIS_SCORE_CAP if outcome.winner == chess.WHITE else -ANALYSIS_SCORE_CAP
+
+def analyse_position(board, depth, move_time, tt):
+    """
+    (best_uci, score, nodes) for board, the score in pawns from White's
+    perspective and clipped to ANALYSIS_SCORE_CAP; best_uci is None when
+    the game is over or the search ended without a move.
+    """
+    score = terminal_score(board)
+    if score is not None:
+        return None, score, 0
+
+    ctx = SearchContext(board, tt=tt)
+    if move_time > 0:
+        move = get_timed_move(board, move_time, depth, ctx)
+    else:
+        move = get_alphabeta_move(board, depth, ctx)
+    score = 0.0 if ctx.score is None else ctx.score
+    score = max(-ANALYSIS_SCORE_CAP, min(ANALYSIS_SCORE_CAP, score))
+    return move.uci() if move is not None else None, score, ctx.nodes + ctx.qnodes
+
+def analyse_positions(fen, moves, first, last, depth, move_time):
+    """
+    analyse_position() for the positions after moves[:first] up to
+    moves[:last - 1], replaying from fen so repetitions count. The table
+    starts empty for every task, so a task's results do not depend on
+    which worker ran it or what it ran before.
+    """
+    tt = _worker_table()
+    tt.clear()
+    board = chess.Board(fen)
+    for uci in moves[:first]:
+        board.push_uci(uci)
+    results = []
+    for ply in range(first, last):
+        results.append(analyse_position(board, depth, move_time, tt))
+        if ply < len(moves):
+            board.push_uci(moves[ply])
+    return results
+
+# -----------------------------------------------------------------
+# Reading games
+# -----------------------------------------------------------------
+def read_games(f, offset=0):
+    """Yield (offset, game) for each game in the open PGN file f from offset on."""
+    f.seek(offset)
+    while True:
+        offset = f.tell()
+        game = chess.pgn.read_game(f)
+        if game is None:
+            return
+        yield offset, game
+
+def game_rows(index, offset, game, results):
+    """
+    One row per move of game from the results of its positions (one more
+    than moves). A move played from a position that is already over (say
+    by the 75-move rule) gets an empty best move and loss.
+    """
+    board = game.board()
+    rows = []
+    for ply, move in enumerate(game.mainline_moves()):
+        best, score, _ = results[ply]
+        played_score = results[ply + 1][1]
+        sign = 1 if board.turn == chess.WHITE else -1
+        loss = None
+        flag = ""
+        if best is not None:
+            loss = 0.0 if move.uci() == best else max(0.0, (score - played_score) * sign)
+            if loss >= ANALYSIS_BLUNDER:
+                flag = "blunder"
+            elif loss >= ANALYSIS_MISTAKE:
+                flag = "mistake"
+        rows.append({
+            "game": index, "offset": offset,
+            "white": game.headers.get("White", "?"), "black": game.headers.get("Black", "?"),
+            "ply": ply + 1, "move": board.san(move),
+            "best": board.san(chess.Move.from_uci(best)) if best is not None else "",
+            "score": round(score, 2), "played_score": round(played_score, 2),
+            "loss": round(loss, 2) if loss is not None else None, "flag": flag,
+        })
+        board.push(move)
+    return rows
+
+# -----------------------------------------------------------------
+# Output
+# -----------------------------------------------------------------
+def output_format(path, fmt=None):
+    return fmt or ("csv" if path.endswith(".csv") else "jsonl")
+
+class RowWriter:
+    """Appends rows as CSV or JSON lines, flushing after every game."""
+    def __init__(self, path, fmt):
+        self.fmt = fmt
+        self.file = open(path, "a", newline="")
+        self.csv = None
+        if fmt == "csv":
+            self.csv = csv.DictWriter(self.file, FIELDS)
+            if self.file.tell() == 0:
+                self.csv.writeheader()
+
+    def write_game(self, rows):
+        if self.csv:
+            self.csv.writerows(rows)
+        else:
+            self.file.writelines(json.dumps(row) + "\n" for row in rows)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+def resume_point(path, fmt):
+    """
+    (offset, game index) to restart from after a run that wrote path.
+    The last game in the file is cut off and analysed again, since the run
+    may have been killed while writing it. Returns (0, 1) for no output.
+    """
+    if not os.path.exists(path):
+        return 0, 1
+    last = None          # (offset, index, byte position of its first row)
+    header = None
+    position = 0
+    with open(path, "rb") as f:
+        for line in f:
+            start, position = position, position + len(line)
+            if not line.endswith(b"\n"):
+                break
+            text = line.decode("utf-8", errors="replace")
+            if fmt == "csv":
+                values = next(csv.reader([text]))
+                if header is None:
+                    header = values
+                    continue
+                row = dict(zip(header, values))
+            else:
+                row = json.loads(text)
+            game = (int(row["offset"]), int(row["game"]))
+            if last is None or game != last[:2]:
+                last = game + (start,)
+    if last is None:
+        return 0, 1
+    with open(path, "r+b") as f:
+        f.truncate(last[2])
+    return last[0], last[1]
+
+# -----------------------------------------------------------------
+# Pipeline
+# -----------------------------------------------------------------
+def analyse_file(pgn_path, out_path, depth=ANALYSIS_DEPTH, move_time=0, workers=None,
+                 fmt=None, offset=0, first_index=1, max_games=None):
+    """
+    Analyse every game in pgn_path from offset on, appending rows to
+    out_path. At most ANALYSIS_QUEUE positions per worker are in flight;
+    beyond that the reader waits for the oldest game to finish. Returns
+    the number of games written.
+    """
+    workers = workers or os.cpu_count() or 1
+    limit = workers * ANALYSIS_QUEUE
+    writer = RowWriter(out_path, output_format(out_path, fmt))
+    mp_context = multiprocessing.get_context("spawn")
+    pending = deque()    # (index, offset, game, futures), in file order
+    in_flight = 0
+    written = 0
+    start = time.perf_counter()
+
+    def finish_oldest():
+        nonlocal in_flight, written
+        index, game_offset, game, futures = pending.popleft()
+        results = [result for future in futures for result in future.result()]
+        in_flight -= len(results)
+        rows = game_rows(index, game_offset, game, results)
+        writer.write_game(rows)
+        written += 1
+        blunders = sum(1 for row in rows if row["flag"] == "blunder")
+        mistakes = sum(1 for row in rows if row["flag"] == "mistake")
+        nodes = sum(result[2] for result in results)
+        print(f"game {index} @{game_offset}: {len(rows)} plies, {blunders} blunders, "
+              f"{mistakes} mistakes, {nodes} nodes, "
+              f"{written * 60 / (time.perf_counter() - start):.1f} games/min", flush=True)
+
+    try:
+        with open(pgn_path, encoding="utf-8", errors="replace") as f, \
+                ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as pool:
+            for index, (game_offset, game) in enumerate(read_games(f, offset), first_index):
+                if max_games is not None and index - first_index >= max_games:
+                    break
+                fen = game.board().fen()
+                moves = [move.uci() for move in game.mainline_moves()]
+                if not moves:
+                    continue
+                positions = len(moves) + 1
+                futures = [pool.submit(analyse_positions, fen, moves, first,
+                                       min(first + ANALYSIS_CHUNK, positions), depth, move_time)
+                           for first in range(0, positions, ANALYSIS_CHUNK)]
+                pending.append((index, game_offset, game, futures))
+                in_flight += positions
+                while in_flight > limit:
+                    finish_oldest()
+            while pending:
+                finish_oldest()
+    finally:
+        writer.close()
+    return written
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch PGN analysis")
+    parser.add_argument("pgn")
+    parser.add_argument("--out", required=True, help=".csv, or JSON lines for anything else")
+    parser.add_argument("--format", choices=("csv", "jsonl"))
+    parser.add_argument("--depth", type=int, default=ANALYSIS_DEPTH,
+                        help="search depth (the depth limit with --movetime)")
+    parser.add_argument("--movetime", type=int, default=0, help="ms per position")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--offset", type=int, default=0, help="byte offset to start reading at")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue after the last game already in --out")
+    parser.add_argument("--max-games", type=int)
+    args = parser.parse_args(argv)
+
+    fmt = output_format(args.out, args.format)
+    offset, first_index = args.offset, 1
+    if args.resume:
+        offset, first_index = resume_point(args.out, fmt)
+        print(f"Resuming at game {first_index}, offset {offset}")
+    count = analyse_file(args.pgn, args.out, args.depth, args.movetime, args.workers, fmt,
+                         offset, first_index, args.max_games)
+    print(f"Wrote {count} games to {args.out}")
+
+if __name__ == "__main__":
+    main()
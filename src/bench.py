@@ -0,0 +1,360 @@
+"""
+Headless engine benchmarks. Never imports pygame.
+
+    python bench.py                      # search suite (same as "search")
+    python -m src.bench search --depth 4 --verbose
+    python -m src.bench ordering --depth 4
+    python -m src.bench quiescence --depth 3
+    python -m src.bench see --depth 2 3
+    python -m src.bench eval
+    python -m src.bench cache --depth 3
+    python -m src.bench parallel --depth 4 --workers 1 2 4 8
+    python -m src.bench perft --depth 3
+"""
+import argparse
+import os
+import random
+import time
+import chess
+from src.ai import (
+    SearchContext, TranspositionTable, get_alphabeta_move, get_parallel_move,
+    get_search_pool, shutdown_search_pool, evaluate_board, evaluate_bitboards,
+    run_algorithm, position, see, pawn_table, get_eval_cache
+)
+from src.searchboard import perft, board_perft, check_against_board, encode_move
+
+# -----------------------------------------------------------------
+# Fixed position suite
+# -----------------------------------------------------------------
+BENCH_FENS = [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "4rrk1/pp1n3p/3q2pQ/2p1pb2/2PP4/2P3N1/P2B2PP/4RRK1 b - - 7 19",
+]
+
+def run_search(fen, depth, **options):
+    """Fixed-depth alpha-beta on a fresh table (unless tt is given); returns (move, ctx, seconds)."""
+    board = chess.Board(fen)
+    options.setdefault("tt", TranspositionTable(16))
+    ctx = SearchContext(board, **options)
+    start = time.perf_counter()
+    move = get_alphabeta_move(board, depth, ctx)
+    return move, ctx, time.perf_counter() - start
+
+# -----------------------------------------------------------------
+# Search suite: every algorithm at every depth
+# -----------------------------------------------------------------
+def bench_search(max_depth, minimax_depth, fens=BENCH_FENS, verbose=False):
+    """
+    Run each algorithm over the suite with fresh tables and a fixed random
+    seed and print nodes, NPS, effective branching factor (nodes at this
+    depth over nodes at the previous one), move lists generated per node
+    and time-to-depth. The closing
+    signature is the total node count, which only changes when search
+    behaviour does, so it can be diffed between commits.
+    """
+    plan = [("random", 0), ("greedy", 1)]
+    plan += [("minimax", depth) for depth in range(1, minimax_depth + 1)]
+    plan += [("alphabeta", depth) for depth in range(1, max_depth + 1)]
+    plan += [("pvs", depth) for depth in range(1, max_depth + 1)]
+
+    print(f"{'algorithm':>9} {'depth':>5} {'nodes':>9} {'nps':>8} {'ebf':>5} {'gen/node':>8} {'time':>8}")
+    signature = 0
+    previous = {}
+    for algorithm, depth in plan:
+        nodes = 0
+        generations = 0
+        elapsed = 0.0
+        moves = []
+        for fen in fens:
+            random.seed(0)
+            board = chess.Board(fen)
+            ctx = SearchContext(board, tt=TranspositionTable(16))
+            start = time.perf_counter()
+            move = run_algorithm(board, algorithm, depth, ctx)
+            elapsed += time.perf_counter() - start
+            nodes += ctx.nodes + ctx.qnodes
+            generations += ctx.generations
+            moves.append(str(move))
+        signature += nodes
+        ebf = f"{nodes / previous[algorithm]:.2f}" if previous.get(algorithm) else "-"
+        previous[algorithm] = nodes
+        nps = nodes / elapsed if elapsed else 0
+        per_node = f"{generations / nodes:.2f}" if nodes else "-"
+        print(f"{algorithm:>9} {depth:>5} {nodes:>9} {nps:>8.0f} {ebf:>5} {per_node:>8} "
+              f"{elapsed:>7.2f}s")
+        if verbose:
+            print("          best: " + " ".join(moves))
+    print(f"Signature: {signature}")
+    return signature
+
+# -----------------------------------------------------------------
+# Move ordering: node counts with and without the orderer
+# -----------------------------------------------------------------
+def bench_ordering(depths, fens=BENCH_FENS):
+    print(f"{'pos':>3} {'depth':>5} {'unordered':>10} {'ordered':>10} {'factor':>7}")
+    for depth in depths:
+        total_plain = total_ordered = 0
+        for i, fen in enumerate(fens):
+            plain = run_search(fen, depth, ordering=False, quiescence=False)[1].nodes
+            ordered = run_search(fen, depth, ordering=True, quiescence=False)[1].nodes
+            total_plain += plain
+            total_ordered += ordered
+            print(f"{i:>3} {depth:>5} {plain:>10} {ordered:>10} {plain / ordered:>6.2f}x")
+        print(f"{'all':>3} {depth:>5} {total_plain:>10} {total_ordered:>10} "
+              f"{total_plain / total_ordered:>6.2f}x")
+
+# -----------------------------------------------------------------
+# Transposition table: nodes searched with and without it
+# -----------------------------------------------------------------
+def bench_tt(depths, fens=BENCH_FENS):
+    print(f"{'pos':>3} {'depth':>5} {'no table':>10} {'table':>10} {'hits':>8} {'factor':>7}")
+    for depth in depths:
+        total_plain = total_table = 0
+        for i, fen in enumerate(fens):
+            plain = run_search(fen, depth, tt=None)[1].nodes
+            ctx = run_search(fen, depth)[1]
+            total_plain += plain
+            total_table += ctx.nodes
+            print(f"{i:>3} {depth:>5} {plain:>10} {ctx.nodes:>10} {ctx.tt_hits:>8} "
+                  f"{plain / ctx.nodes:>6.2f}x")
+        print(f"{'all':>3} {depth:>5} {total_plain:>10} {total_table:>10} {'':>8} "
+              f"{total_plain / total_table:>6.2f}x")
+
+# -----------------------------------------------------------------
+# Quiescence: cost of resolving captures at the leaves
+# -----------------------------------------------------------------
+def bench_quiescence(depths, fens=BENCH_FENS):
+    print(f"{'pos':>3} {'depth':>5} {'qsearch':>7} {'nodes':>8} {'qnodes':>8} "
+          f"{'time':>7} {'move':>6}")
+    for depth in depths:
+        for i, fen in enumerate(fens):
+            for enabled in (False, True):
+                move, ctx, elapsed = run_search(fen, depth, quiescence=enabled)
+                print(f"{i:>3} {depth:>5} {'on' if enabled else 'off':>7} {ctx.nodes:>8} "
+                      f"{ctx.qnodes:>8} {elapsed:>6.2f}s {str(move):>6}")
+
+# -----------------------------------------------------------------
+# Static exchange evaluation: known exchanges, then search cost
+# -----------------------------------------------------------------
+SEE_CASES = [  # (fen, move, pawns won by the side to move)
+    ("1k1r4/1pp4p/p7/4p3/8/P5P1/1PP4P/2K1R3 w - - 0 1", "e1e5", 1),            # free pawn
+    ("1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1", "d3e5", -2),  # x-rays both sides
+    ("4k3/8/3p4/4n3/3P4/8/8/4K3 w - - 0 1", "d4e5", 2),                        # pawn takes defended knight
+    ("4k3/8/3p4/4p3/8/8/7Q/4K3 w - - 0 1", "h2e5", -8),                        # queen takes defended pawn
+    ("4k3/4r3/8/4p3/8/8/4R3/4R1K1 w - - 0 1", "e2e5", 1),                      # doubled rooks
+    ("4k3/8/2p5/3p4/8/8/6B1/7Q w - - 0 1", "g2d5", -1),                        # queen behind bishop
+    ("4k3/8/8/8/3pP3/8/8/4K3 b - e3 0 1", "d4e3", 1),                          # en passant
+    ("3rk3/8/8/8/8/8/3P4/4K3 b - - 0 1", "d8d2", -4),                          # king recaptures
+    ("3qk3/3r4/8/8/8/8/3P4/4K3 b - - 0 1", "d7d2", 1),                         # ...unless defended
+    ("1r2k3/P7/8/8/8/8/8/4K3 w - - 0 1", "a7b8q", 13),                         # capture and promote
+]
+
+def check_see(cases=SEE_CASES):
+    """Print see() for each known exchange; returns how many are wrong."""
+    failures = 0
+    print(f"{'fen':<58} {'move':>6} {'see':>4} {'want':>4}")
+    for fen, uci, expected in cases:
+        board = chess.Board(fen)
+        value = see(position(board), encode_move(chess.Move.from_uci(uci)))
+        failures += value != expected
+        print(f"{fen:<58} {uci:>6} {value:>4} {expected:>4}{'' if value == expected else '  WRONG'}")
+    return failures
+
+def bench_see(depths, fens=BENCH_FENS):
+    """
+    check_see(), then each position searched with and without static
+    exchange (ordering, quiescence skipping, shallow pruning). Returns the
+    number of wrong exchanges.
+    """
+    failures = check_see()
+    print()
+    print(f"{'pos':>3} {'depth':>5} {'see':>4} {'nodes':>8} {'qnodes':>8} {'time':>7} {'move':>6}")
+    for depth in depths:
+        totals = {False: [0, 0, 0.0], True: [0, 0, 0.0]}
+        for i, fen in enumerate(fens):
+            for enabled in (False, True):
+                move, ctx, elapsed = run_search(fen, depth, see=enabled)
+                total = totals[enabled]
+                total[0] += ctx.nodes
+                total[1] += ctx.qnodes
+                total[2] += elapsed
+                print(f"{i:>3} {depth:>5} {'on' if enabled else 'off':>4} {ctx.nodes:>8} "
+                      f"{ctx.qnodes:>8} {elapsed:>6.2f}s {str(move):>6}")
+        for enabled in (False, True):
+            nodes, qnodes, elapsed = totals[enabled]
+            print(f"{'all':>3} {depth:>5} {'on' if enabled else 'off':>4} {nodes:>8} "
+                  f"{qnodes:>8} {elapsed:>6.2f}s")
+    print("see: all exchanges match" if not failures else f"see: {failures} wrong")
+    return failures
+
+# -----------------------------------------------------------------
+# Evaluation throughput: per-square scan vs bitboards
+# -----------------------------------------------------------------
+EVALUATORS = [
+    ("squares", evaluate_board),
+    ("bitboard", lambda board: evaluate_bitboards(board, structure=False)),
+    ("bitboard+structure", lambda board: evaluate_bitboards(board, structure=True, pawns=None)),
+]
+
+def bench_eval(iterations, fens=BENCH_FENS):
+    boards = [chess.Board(fen) for fen in fens]
+    identical = all(evaluate_board(b) == evaluate_bitboards(b, structure=False) for b in boards)
+    print(f"bitboard matches squares: {'yes' if identical else 'NO'}")
+    print(f"{'evaluator':>18} {'evals/s':>10}")
+    for name, evaluate in EVALUATORS:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for board in boards:
+                evaluate(board)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>18} {iterations * len(boards) / elapsed:>10.0f}")
+
+# -----------------------------------------------------------------
+# Evaluation caches: pawn hash and whole-evaluation cache in a search
+# -----------------------------------------------------------------
+def bench_cache(depths, evaluator="bitboard", fens=BENCH_FENS):
+    """
+    Search the suite with evaluator, caches off and then on (emptied
+    first), and print time and the hit rate of each cache.
+    """
+    print(f"{'depth':>5} {'caches':>6} {'nodes':>8} {'qnodes':>8} {'time':>7} "
+          f"{'pawn hits':>9} {'eval hits':>9}")
+    for depth in depths:
+        for enabled in (False, True):
+            caches = [pawn_table if evaluator == "bitboard" else None, get_eval_cache(evaluator)]
+            for cache in caches:
+                if cache is not None:
+                    cache.clear()
+            nodes = qnodes = 0
+            elapsed = 0.0
+            for fen in fens:
+                _, ctx, seconds = run_search(fen, depth, evaluator=evaluator, eval_cache=enabled)
+                nodes += ctx.nodes
+                qnodes += ctx.qnodes
+                elapsed += seconds
+            rates = [f"{cache.hit_rate:.0%}" if enabled and cache is not None else "-"
+                     for cache in caches]
+            print(f"{depth:>5} {'on' if enabled else 'off':>6} {nodes:>8} {qnodes:>8} "
+                  f"{elapsed:>6.2f}s {rates[0]:>9} {rates[1]:>9}")
+
+# -----------------------------------------------------------------
+# Parallel search: time-to-depth against worker count
+# -----------------------------------------------------------------
+def bench_parallel(depth, worker_counts, fens=BENCH_FENS):
+    print(f"depth {depth}, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'time':>8} {'speedup':>8} {'nodes':>9}")
+    baseline = None
+    for workers in worker_counts:
+        # Fresh pool per row; spawn it before timing so startup is not counted
+        shutdown_search_pool()
+        pool = get_search_pool(workers)
+        list(pool.map(abs, range(workers)))
+        nodes = 0
+        start = time.perf_counter()
+        for fen in fens:
+            board = chess.Board(fen)
+            ctx = SearchContext(board)
+            get_parallel_move(board, depth, workers, ctx)
+            nodes += ctx.nodes + ctx.qnodes
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>7} {elapsed:>7.2f}s {baseline / elapsed:>7.2f}x {nodes:>9}")
+    shutdown_search_pool()
+
+# -----------------------------------------------------------------
+# Perft: the search board's move generator against python-chess
+# -----------------------------------------------------------------
+PERFT_FENS = BENCH_FENS + [
+    "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+]
+
+def bench_perft(depth, check_depth, fens=PERFT_FENS):
+    """
+    Count leaf nodes with the SearchBoard and with python-chess and time
+    both. Then walk both boards together check_depth plies deep, comparing
+    move order, hash, evaluation and game-end detection at every node.
+    """
+    print(f"{'pos':>3} {'depth':>5} {'nodes':>9} {'python-chess':>12} {'match':>5} "
+          f"{'time':>7} {'chess':>7} {'speedup':>7}")
+    failures = 0
+    for i, fen in enumerate(fens):
+        board = chess.Board(fen)
+        pos = position(board)
+        for d in range(1, depth + 1):
+            start = time.perf_counter()
+            nodes = perft(pos, d)
+            elapsed = time.perf_counter() - start
+            start = time.perf_counter()
+            expected = board_perft(board, d)
+            reference = time.perf_counter() - start
+            match = nodes == expected
+            failures += not match
+            print(f"{i:>3} {d:>5} {nodes:>9} {expected:>12} {'yes' if match else 'NO':>5} "
+                  f"{elapsed:>6.2f}s {reference:>6.2f}s {reference / max(elapsed, 1e-9):>6.2f}x")
+        try:
+            check_against_board(pos, board, check_depth)
+        except AssertionError as e:
+            failures += 1
+            print(f"{i:>3} lockstep check failed: {e}")
+    print("perft: all positions match" if not failures else f"perft: {failures} failures")
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chess AI benchmarks")
+    sub = parser.add_subparsers(dest="command")
+    search = sub.add_parser("search", help="all algorithms over the FEN suite (default)")
+    search.add_argument("--depth", type=int, default=4, help="deepest alpha-beta search")
+    search.add_argument("--minimax-depth", type=int, default=3)
+    search.add_argument("--verbose", action="store_true", help="list best moves")
+    ordering = sub.add_parser("ordering", help="node counts with/without move ordering")
+    ordering.add_argument("--depth", type=int, nargs="+", default=[3, 4])
+    tt_parser = sub.add_parser("tt", help="node counts with/without the transposition table")
+    tt_parser.add_argument("--depth", type=int, nargs="+", default=[4, 5])
+    quiescence = sub.add_parser("quiescence", help="leaf search cost with/without quiescence")
+    quiescence.add_argument("--depth", type=int, nargs="+", default=[2, 3])
+    see_parser = sub.add_parser("see", help="static exchange cases, search cost with/without")
+    see_parser.add_argument("--depth", type=int, nargs="+", default=[2, 3])
+    evaluation = sub.add_parser("eval", help="evaluations per second for each evaluator")
+    evaluation.add_argument("--iterations", type=int, default=2000)
+    cache = sub.add_parser("cache", help="search time and hit rates with/without eval caches")
+    cache.add_argument("--depth", type=int, nargs="+", default=[3, 4])
+    cache.add_argument("--evaluator", default="bitboard", choices=("bitboard", "squares"))
+    parallel = sub.add_parser("parallel", help="time-to-depth speedup curve by worker count")
+    parallel.add_argument("--depth", type=int, default=4)
+    parallel.add_argument("--workers", type=int, nargs="+",
+                          default=[1, 2, 4, 8, os.cpu_count() or 1])
+    perft_parser = sub.add_parser("perft", help="search board move generation vs python-chess")
+    perft_parser.add_argument("--depth", type=int, default=3)
+    perft_parser.add_argument("--check-depth", type=int, default=2,
+                              help="plies walked in lockstep with python-chess")
+    args = parser.parse_args(argv)
+
+    if args.command in (None, "search"):
+        bench_search(getattr(args, "depth", 4), getattr(args, "minimax_depth", 3),
+                     verbose=getattr(args, "verbose", False))
+    elif args.command == "ordering":
+        bench_ordering(args.depth)
+    elif args.command == "tt":
+        bench_tt(args.depth)
+    elif args.command == "quiescence":
+        bench_quiescence(args.depth)
+    elif args.command == "see":
+        if bench_see(args.depth):
+            raise SystemExit(1)
+    elif args.command == "eval":
+        bench_eval(args.iterations)
+    elif args.command == "cache":
+        bench_cache(args.depth, args.evaluator)
+    elif args.command == "parallel":
+        bench_parallel(args.depth, sorted(set(args.workers)))
+    elif args.command == "perft":
+        if bench_perft(args.depth, args.check_depth):
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
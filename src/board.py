@@ -31,12 +31,23 @@ def get_piece_image(symbol):
 # -----------------------------------------------------------------
 # Board drawing
 # -----------------------------------------------------------------
+_square_layers = {}
+
+def get_square_layer(perspective=chess.WHITE):
+    """The empty checkerboard, drawn once per perspective."""
+    layer = _square_layers.get(perspective)
+    if layer is None:
+        layer = pygame.Surface((SQUARE_SIZE * 8, SQUARE_SIZE * 8))
+        for row in range(8):
+            for col in range(8):
+                color = LIGHT if (row + col) % 2 == 0 else DARK
+                rect = (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+                pygame.draw.rect(layer, color, rect)
+        _square_layers[perspective] = layer
+    return layer
+
 def draw_board(screen, hover_square=None, perspective=chess.WHITE):
-    for row in range(8):
-        for col in range(8):
-            color = LIGHT if (row + col) % 2 == 0 else DARK
-            rect = (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
-            pygame.draw.rect(screen, color, rect)
+    screen.blit(get_square_layer(perspective), (0, 0))
 
     # Hover effect
     if hover_square is not None:
@@ -56,6 +67,7 @@ class AnimatedPiece:
         self.perspective = perspective
         self.progress = 0.0
         self.active = True
+        self.drawn_rect = None
 
     def update(self, dt):
         self.progress += dt / ANIMATION_SPEED
@@ -63,35 +75,61 @@ class AnimatedPiece:
             self.progress = 1.0
             self.active = False
 
-    def draw(self, screen):
+    def rect(self):
         from_x, from_y = square_to_coords(self.from_square, self.perspective)
         to_x, to_y = square_to_coords(self.to_square, self.perspective)
         x = lerp(from_x, to_x, self.progress)
         y = lerp(from_y, to_y, self.progress)
+        return pygame.Rect(int(x), int(y), SQUARE_SIZE, SQUARE_SIZE)
+
+    def draw(self, screen):
+        rect = self.rect()
         img = get_piece_image(self.piece.symbol())
         if img:
-            screen.blit(img, (x, y))
+            screen.blit(img, rect)
+        self.drawn_rect = rect
 
-def draw_pieces(screen, board, perspective, animated_moves=None):
-    moving_square = None
-    if animated_moves:
-        for anim in animated_moves:
-            if anim.active:
-                moving_square = anim.to_square
-                break
+    def dirty_rect(self):
+        """Screen area to refresh: where the piece was last drawn and where it is now."""
+        rect = self.rect()
+        return rect.union(self.drawn_rect) if self.drawn_rect else rect
 
+def moving_square(animated_moves):
+    """Destination of the first active animation, whose piece the layer leaves out."""
+    for anim in animated_moves or ():
+        if anim.active:
+            return anim.to_square
+    return None
+
+def draw_static_pieces(screen, board, perspective, hidden_square=None):
     for square in chess.SQUARES:
         piece = board.piece_at(square)
-        if piece and square != moving_square:
+        if piece and square != hidden_square:
             x, y = square_to_coords(square, perspective)
             img = get_piece_image(piece.symbol())
             if img:
                 screen.blit(img, (x, y))
 
-    if animated_moves:
-        for anim in animated_moves:
-            if anim.active:
-                anim.draw(screen)
+class BoardLayer:
+    """
+    The board as it looks between frames: squares, hover, pieces and the
+    check highlight, composed onto one surface. It is rebuilt only when
+    one of those inputs changes, so a still board costs a single blit.
+    """
+    def __init__(self):
+        self.surface = pygame.Surface((SQUARE_SIZE * 8, SQUARE_SIZE * 8))
+        self.key = None
+
+    def update(self, board, perspective, hover_square=None, hidden_square=None):
+        """Rebuild if anything drawn on the layer changed; returns True if it did."""
+        key = (board.board_fen(), board.turn, perspective, hover_square, hidden_square)
+        if key == self.key:
+            return False
+        self.key = key
+        draw_board(self.surface, hover_square, perspective)
+        draw_static_pieces(self.surface, board, perspective, hidden_square)
+        draw_check(self.surface, board, perspective)
+        return True
 
 # -----------------------------------------------------------------
 # Highlights
@@ -104,20 +142,20 @@ def highlight_square(screen, square, perspective, color=HIGHLIGHT, alpha=80):
     s.fill(color + (alpha,))
     screen.blit(s, (x, y))
 
-def draw_move_hints(screen, board, square, perspective, time_ms):
+def draw_move_hints(screen, move_index, square, perspective, time_ms):
+    """Pulsing dots on the selected piece's destinations; returns their squares' rects."""
     if square is None:
-        return
-    piece = board.piece_at(square)
-    if piece is None:
-        return
+        return []
     pulse = 0.5 + 0.5 * math.sin(time_ms * 0.005)
     radius = int(SQUARE_SIZE // 6 * (0.8 + pulse * 0.4))
-    for move in board.legal_moves:
-        if move.from_square == square:
-            x, y = square_to_coords(move.to_square, perspective)
-            center = (x + SQUARE_SIZE // 2, y + SQUARE_SIZE // 2)
-            pygame.draw.circle(screen, MOVE_HINT, center, radius)
-            pygame.draw.circle(screen, (255, 255, 255), center, radius-2, 1)
+    rects = []
+    for to_square in move_index.destinations(square):
+        x, y = square_to_coords(to_square, perspective)
+        center = (x + SQUARE_SIZE // 2, y + SQUARE_SIZE // 2)
+        pygame.draw.circle(screen, MOVE_HINT, center, radius)
+        pygame.draw.circle(screen, (255, 255, 255), center, radius-2, 1)
+        rects.append(pygame.Rect(x, y, SQUARE_SIZE, SQUARE_SIZE))
+    return rects
 
 def draw_check(screen, board, perspective):
     if board.is_check():
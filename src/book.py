@@ -0,0 +1,111 @@
+"""
+Polyglot opening book: lookup before search, and an offline builder.
+
+    python -m src.book build games.pgn assets/book.bin --max-ply 16
+"""
+import argparse
+import random
+import struct
+import chess
+import chess.polyglot
+from settings import BOOK_PATH, BOOK_MAX_PLY
+
+# -----------------------------------------------------------------
+# Lookup
+# -----------------------------------------------------------------
+_reader = None
+
+def get_book_reader(path=BOOK_PATH):
+    """
+    The book at path, opened once. python-chess's reader memory-maps the
+    file and binary-searches it by Zobrist key, so opening is instant and
+    nothing is loaded into the heap however large the book is.
+    Returns None when there is no usable book.
+    """
+    global _reader
+    if _reader is None:
+        try:
+            _reader = chess.polyglot.open_reader(path)
+        except (OSError, ValueError):
+            _reader = False
+    return _reader or None
+
+def book_move(board, max_ply=BOOK_MAX_PLY):
+    """Weighted-random book move for board, or None when out of book."""
+    if board.ply() >= max_ply:
+        return None
+    reader = get_book_reader()
+    if reader is None:
+        return None
+    try:
+        return reader.weighted_choice(board, random=random).move
+    except IndexError:
+        return None
+
+# -----------------------------------------------------------------
+# Building a book from PGN
+# -----------------------------------------------------------------
+ENTRY_STRUCT = struct.Struct(">QHHI")  # key, move, weight, learn
+RESULT_POINTS = {"1-0": (2, 0), "0-1": (0, 2), "1/2-1/2": (1, 1)}
+
+def encode_move(board, move):
+    """Polyglot move bits; castling is written as the king taking its rook."""
+    to_square = move.to_square
+    if board.is_castling(move):
+        rook_file = 7 if board.is_kingside_castling(move) else 0
+        to_square = chess.square(rook_file, chess.square_rank(move.from_square))
+    promotion = move.promotion - 1 if move.promotion else 0
+    return to_square | (move.from_square << 6) | (promotion << 12)
+
+def build_book(pgn_path, out_path, max_ply=BOOK_MAX_PLY):
+    """
+    Count every move played in the first max_ply plies of the games in
+    pgn_path, weighted like Polyglot (2 per win, 1 per draw for the side
+    that played it), and write the result as a Polyglot .bin file.
+    Returns the number of entries written.
+    """
+    import chess.pgn  # pulls in chess.engine and asyncio; only the builder needs it
+    weights = {}
+    with open(pgn_path, encoding="utf-8", errors="replace") as f:
+        while True:
+            game = chess.pgn.read_game(f)
+            if game is None:
+                break
+            points = RESULT_POINTS.get(game.headers.get("Result"), (1, 1))
+            board = game.board()
+            for move in game.mainline_moves():
+                if board.ply() >= max_ply:
+                    break
+                entry = (chess.polyglot.zobrist_hash(board), encode_move(board, move))
+                score = points[0] if board.turn == chess.WHITE else points[1]
+                weights[entry] = weights.get(entry, 0) + score
+                board.push(move)
+
+    # Weights are 16 bits; scale down rather than clip so ratios survive
+    top = max(weights.values(), default=0)
+    scale = 0xFFFF / top if top > 0xFFFF else 1
+    entries = sorted(
+        ((key, raw_move, int(weight * scale)) for (key, raw_move), weight in weights.items()),
+        key=lambda entry: (entry[0], -entry[2])
+    )
+    with open(out_path, "wb") as f:
+        for key, raw_move, weight in entries:
+            if weight:
+                f.write(ENTRY_STRUCT.pack(key, raw_move, weight, 0))
+    return sum(1 for entry in entries if entry[2])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Polyglot opening book tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="build a .bin book from a PGN file")
+    build.add_argument("pgn")
+    build.add_argument("out", nargs="?", default=BOOK_PATH)
+    build.add_argument("--max-ply", type=int, default=BOOK_MAX_PLY)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        count = build_book(args.pgn, args.out, args.max_ply)
+        print(f"Wrote {count} entries to {args.out}")
+
+if __name__ == "__main__":
+    main()
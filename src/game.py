@@ -1,17 +1,17 @@
 import pygame
 import chess
 from settings import (
-    HEIGHT, SQUARE_SIZE, AI_DELAY, FPS,
+    HEIGHT, SQUARE_SIZE, AI_DELAY, AI_MOVE_TIME, PONDER, FPS, IDLE_WAIT, THINKING_POLL,
     HIGHLIGHT, PANEL_BG, PANEL_TEXT, TEXT_COLOR, BUTTON_COLOR, BUTTON_HOVER
 )
 from src.board import (
-    draw_board, draw_pieces, draw_move_hints, highlight_square, draw_check,
-    AnimatedPiece, get_piece_image
+    draw_move_hints, highlight_square, moving_square, AnimatedPiece, BoardLayer
 )
-from src.ai import get_ai_move
-from src.utils import get_square_from_mouse, square_to_coords
+from src.worker import get_ai_worker
+from src.utils import get_square_from_mouse, square_to_coords, next_events, MoveIndex
 from src.sound import SoundManager
-from src.save_load import save_game
+from src.save_load import GameJournal
+from src.text import render_text
 
 # -----------------------------------------------------------------
 # Screen dimensions – board is square, panel on the right
@@ -21,43 +21,116 @@ PANEL_WIDTH = 200
 SCREEN_WIDTH = BOARD_WIDTH + PANEL_WIDTH
 SCREEN_HEIGHT = HEIGHT
 
-def draw_panel(screen, board, depth, ai_color, player_color, sound_mgr):
-    """Draw game information panel with classic colors."""
-    panel_rect = pygame.Rect(BOARD_WIDTH, 0, PANEL_WIDTH, SCREEN_HEIGHT)
-    pygame.draw.rect(screen, PANEL_BG, panel_rect)
-
-    font = pygame.font.Font(None, 28)
-    small_font = pygame.font.Font(None, 22)
+def stats_lines(stats):
+    """Panel readout for a SearchStats.to_dict() record."""
+    if stats["algorithm"] in ("random", "book"):
+        return [f"Last move: {stats['move']} ({stats['algorithm']})"]
+    score, mate = stats["score"], stats.get("mate")
+    if mate is not None:
+        eval_text = f"Eval: #{mate:+d}"
+    else:
+        eval_text = f"Eval: {score:+.2f}" if score is not None else "Eval: -"
+    lines = [
+        f"Last move: {stats['move']}",
+        eval_text,
+        f"Depth: {stats['depth']}  Sel: {stats['max_ply']}",
+        f"Nodes: {stats['nodes']:,}",
+        f"QNodes: {stats['qnodes']:,}",
+        f"NPS: {stats['nps']:,}",
+        f"Time: {stats['elapsed']:.2f}s",
+        f"1st cutoffs: {stats['first_move_cutoff_rate']:.0%}",
+        f"TT hits: {stats['tt_hits']:,}",
+    ]
+    tries = stats.get("ponder_hits", 0) + stats.get("ponder_misses", 0)
+    if tries:
+        lines.append(f"Ponder: {stats['ponder_hits']}/{tries}  "
+                     f"saved {stats['ponder_saved']:.1f}s")
+    pv = stats["pv"]
+    for start in range(0, min(len(pv), 6), 3):
+        lines.append(("PV: " if start == 0 else "      ") + " ".join(pv[start:start + 3]))
+    return lines
+
+def draw_panel(surface, board, depth, ai_color, player_color, sound_mgr, move_time=0,
+               stats=None):
+    """Draw game information panel with classic colors onto a panel-sized surface."""
+    surface.fill(PANEL_BG)
 
     # Turn indicator
     turn_text = "White" if board.turn == chess.WHITE else "Black"
-    turn_label = font.render(f"Turn: {turn_text}", True, PANEL_TEXT)
-    screen.blit(turn_label, (BOARD_WIDTH + 20, 30))
+    surface.blit(render_text(f"Turn: {turn_text}", 28, PANEL_TEXT), (20, 30))
 
     # Player side
     player_text = "You: White" if player_color == chess.WHITE else "You: Black"
-    player_label = font.render(player_text, True, PANEL_TEXT)
-    screen.blit(player_label, (BOARD_WIDTH + 20, 70))
+    surface.blit(render_text(player_text, 28, PANEL_TEXT), (20, 70))
 
     # AI depth
-    depth_label = font.render(f"AI Depth: {depth}", True, PANEL_TEXT)
-    screen.blit(depth_label, (BOARD_WIDTH + 20, 110))
+    surface.blit(render_text(f"AI Depth: {depth}", 28, PANEL_TEXT), (20, 110))
+    if move_time:
+        surface.blit(render_text(f"Time/move: {move_time} ms", 22, PANEL_TEXT), (20, 135))
 
     # Sound toggle
     sound_text = f"Sound: {'ON' if sound_mgr.enabled else 'OFF'}"
-    sound_label = small_font.render(sound_text, True, PANEL_TEXT)
-    screen.blit(sound_label, (BOARD_WIDTH + 20, 160))
-    s_hint = small_font.render("Press 'S' to toggle", True, PANEL_TEXT)
-    screen.blit(s_hint, (BOARD_WIDTH + 20, 185))
+    surface.blit(render_text(sound_text, 22, PANEL_TEXT), (20, 160))
+    surface.blit(render_text("Press 'S' to toggle", 22, PANEL_TEXT), (20, 185))
 
-    # ESC and M hints
-    esc_label = small_font.render("ESC: Save & Menu", True, PANEL_TEXT)
-    screen.blit(esc_label, (BOARD_WIDTH + 20, SCREEN_HEIGHT - 60))
-    menu_label = small_font.render("M: Menu (no save)", True, PANEL_TEXT)
-    screen.blit(menu_label, (BOARD_WIDTH + 20, SCREEN_HEIGHT - 35))
+    # Last search
+    if stats is not None:
+        for i, line in enumerate(stats_lines(stats)):
+            surface.blit(render_text(line, 22, PANEL_TEXT), (20, 230 + i * 22))
 
-def run_game(screen, clock, board, depth, ai_color, player_color):
-    """Main game loop with animations and sounds."""
+    # ESC and M hints
+    surface.blit(render_text("ESC: Save & Menu", 22, PANEL_TEXT), (20, SCREEN_HEIGHT - 60))
+    surface.blit(render_text("M: Menu (no save)", 22, PANEL_TEXT), (20, SCREEN_HEIGHT - 35))
+
+class Panel:
+    """The side panel, kept on its own surface and redrawn only when what it shows changes."""
+    def __init__(self):
+        self.surface = pygame.Surface((PANEL_WIDTH, SCREEN_HEIGHT))
+        self.key = None
+
+    def draw(self, screen, board, depth, ai_color, player_color, sound_mgr, move_time=0,
+             stats=None):
+        key = (board.turn, depth, player_color, sound_mgr.enabled, move_time, stats)
+        if key != self.key:
+            self.key = key
+            draw_panel(self.surface, board, depth, ai_color, player_color, sound_mgr,
+                       move_time, stats)
+        screen.blit(self.surface, (BOARD_WIDTH, 0))
+
+def game_over_buttons():
+    """(new game, menu) button rects of the game over popup."""
+    btn_w = 120
+    btn_h = 50
+    new_rect = pygame.Rect(SCREEN_WIDTH//2 - btn_w - 10, SCREEN_HEIGHT//2 + 20, btn_w, btn_h)
+    menu_rect = pygame.Rect(SCREEN_WIDTH//2 + 10, SCREEN_HEIGHT//2 + 20, btn_w, btn_h)
+    return new_rect, menu_rect
+
+def draw_game_over(screen, board):
+    """Result message and buttons, over an already dimmed screen."""
+    if board.is_checkmate():
+        winner = "Black" if board.turn == chess.WHITE else "White"
+        msg = f"Checkmate! {winner} wins."
+    else:
+        msg = "Stalemate!"
+    text = render_text(msg, 60, (255, 255, 255))
+    text_rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 40))
+    screen.blit(text, text_rect)
+
+    # Buttons
+    new_rect, menu_rect = game_over_buttons()
+    pygame.draw.rect(screen, (0, 150, 0), new_rect, border_radius=8)
+    pygame.draw.rect(screen, (150, 0, 0), menu_rect, border_radius=8)
+    new_text = render_text("New", 40, (255,255,255))
+    menu_text = render_text("Menu", 40, (255,255,255))
+    screen.blit(new_text, new_text.get_rect(center=new_rect.center))
+    screen.blit(menu_text, menu_text.get_rect(center=menu_rect.center))
+
+def run_game(screen, clock, board, depth, ai_color, player_color, move_time=AI_MOVE_TIME,
+             slot=0, resume=False):
+    """
+    Main game loop with animations and sounds. Every move is journaled to
+    save slot as it is played; resume=True continues the game loaded from it.
+    """
     # Switch to game screen size
     game_screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("Chess AI - Playing")
@@ -69,8 +142,16 @@ def run_game(screen, clock, board, depth, ai_color, player_color):
 
     animated_moves = []
     last_time = pygame.time.get_ticks()
+    board_layer = BoardLayer()
+    move_index = MoveIndex(board)
+    panel = Panel()
+    last_frame_state = None
 
     sound_mgr = SoundManager()
+    ai_worker = get_ai_worker()
+    ai_worker.last_stats = None
+    journal = GameJournal(slot)
+    journal.start(board, depth, ai_color, player_color, move_time, resume)
 
     running = True
     while running:
@@ -83,16 +164,30 @@ def run_game(screen, clock, board, depth, ai_color, player_color):
             if not anim.active:
                 animated_moves.remove(anim)
 
-        # Event handling
-        for event in pygame.event.get():
+        # Event handling: full frame rate only while something moves on
+        # screen; otherwise sleep until input arrives or the worker may be done
+        ai_worker.poll()
+        if animated_moves or selected_square is not None:
+            wait = 0
+        elif ai_thinking or ai_worker.queued():
+            wait = THINKING_POLL
+        else:
+            wait = IDLE_WAIT
+        for event in next_events(wait):
             if event.type == pygame.QUIT:
+                ai_worker.cancel()
+                journal.close()
                 return 'quit'
 
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
-                    save_game(board, depth, ai_color, player_color)
+                    ai_worker.cancel()
+                    journal.checkpoint(board)
+                    journal.close()
                     return 'menu'
                 elif event.key == pygame.K_m:
+                    ai_worker.cancel()
+                    journal.rollback()
                     return 'menu'
                 elif event.key == pygame.K_s:
                     sound_mgr.toggle()
@@ -108,7 +203,15 @@ def run_game(screen, clock, board, depth, ai_color, player_color):
                     hover_square = None
 
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                if not ai_thinking and board.turn != ai_color:
+                if move_index.game_over:
+                    new_rect, menu_rect = game_over_buttons()
+                    if new_rect.collidepoint(event.pos):
+                        journal.close()
+                        return 'new'
+                    elif menu_rect.collidepoint(event.pos):
+                        journal.close()
+                        return 'menu'
+                elif not ai_thinking and board.turn != ai_color:
                     mouse_pos = (event.pos[0], event.pos[1])
                     if mouse_pos[0] < BOARD_WIDTH:
                         clicked_square = get_square_from_mouse(mouse_pos, player_color)
@@ -116,17 +219,10 @@ def run_game(screen, clock, board, depth, ai_color, player_color):
                             clicked_piece = board.piece_at(clicked_square)
 
                             if selected_square is not None:
-                                move = chess.Move(selected_square, clicked_square)
                                 # Promotion: default to queen
-                                if move in board.legal_moves:
-                                    piece = board.piece_at(selected_square)
-                                    if piece and piece.piece_type == chess.PAWN:
-                                        to_rank = move.to_square // 8
-                                        if (piece.color == chess.WHITE and to_rank == 7) or \
-                                           (piece.color == chess.BLACK and to_rank == 0):
-                                            move.promotion = chess.QUEEN
+                                move = move_index.move(selected_square, clicked_square)
 
-                                if move in board.legal_moves:
+                                if move is not None:
                                     # Play sound
                                     if board.is_capture(move):
                                         sound_mgr.play('capture')
@@ -139,12 +235,16 @@ def run_game(screen, clock, board, depth, ai_color, player_color):
                                     animated_moves.append(anim)
 
                                     board.push(move)
+                                    journal.record(move)
+                                    move_index = MoveIndex(board)
                                     selected_square = None
 
                                     if board.is_check():
                                         sound_mgr.play('check')
-                                    if board.is_game_over():
+                                    if move_index.game_over:
                                         sound_mgr.play('game_end')
+                                        # Nothing left to ponder on
+                                        ai_worker.cancel()
                                 else:
                                     if clicked_piece and clicked_piece.color == board.turn:
                                         selected_square = clicked_square
@@ -154,16 +254,23 @@ def run_game(screen, clock, board, depth, ai_color, player_color):
                                 if clicked_piece and clicked_piece.color == board.turn:
                                     selected_square = clicked_square
 
-        # AI turn
-        if not board.is_game_over() and board.turn == ai_color:
+        # AI turn: the search runs in the worker process while the loop keeps
+        # drawing; AI_DELAY is now a minimum think time, not extra waiting
+        if not move_index.game_over and board.turn == ai_color:
             if not ai_thinking and not animated_moves:
                 ai_thinking = True
                 ai_move_time = pygame.time.get_ticks() + AI_DELAY
+                ai_worker.start(board, depth, move_time)
         else:
             ai_thinking = False
 
-        if ai_thinking and pygame.time.get_ticks() >= ai_move_time and not animated_moves:
-            move = get_ai_move(board, depth)
+        if ai_thinking and pygame.time.get_ticks() >= ai_move_time and not animated_moves \
+                and ai_worker.ready():
+            move = ai_worker.result()
+            if move is None:
+                # A search stopped inside depth 1 has no move; searching
+                # again would only stall the same way
+                move = next(iter(board.legal_moves), None)
             if move is not None:
                 if board.is_capture(move):
                     sound_mgr.play('capture')
@@ -175,78 +282,68 @@ def run_game(screen, clock, board, depth, ai_color, player_color):
                 animated_moves.append(anim)
 
                 board.push(move)
+                journal.record(move)
+                move_index = MoveIndex(board)
                 if board.is_check():
                     sound_mgr.play('check')
-                if board.is_game_over():
+                if move_index.game_over:
                     sound_mgr.play('game_end')
+                elif PONDER:
+                    ai_worker.ponder(board, depth, move_time)
 
             selected_square = None
             ai_thinking = False
 
-        # Drawing
-        game_screen.fill(PANEL_BG)
-
-        # Draw board on its own surface
-        board_surface = pygame.Surface((BOARD_WIDTH, HEIGHT))
-        draw_board(board_surface, hover_square, player_color)
-        draw_pieces(board_surface, board, player_color, animated_moves)
-        draw_check(board_surface, board, player_color)
-
-        if selected_square is not None:
-            highlight_square(board_surface, selected_square, player_color, HIGHLIGHT, 100)
-            draw_move_hints(board_surface, board, selected_square, player_color, pygame.time.get_ticks())
-
-        game_screen.blit(board_surface, (0, 0))
-        draw_panel(game_screen, board, depth, ai_color, player_color, sound_mgr)
-
-        # AI thinking message
-        if ai_thinking:
-            font = pygame.font.Font(None, 36)
-            text = font.render("AI is thinking...", True, (0, 0, 0))
-            text_rect = text.get_rect(center=(BOARD_WIDTH//2, HEIGHT//2))
-            s = pygame.Surface((text_rect.width+20, text_rect.height+10), pygame.SRCALPHA)
-            s.fill((255, 255, 255, 200))
-            game_screen.blit(s, (text_rect.x-10, text_rect.y-5))
-            game_screen.blit(text, text_rect)
-
-        # Game over popup
-        if board.is_game_over():
-            s = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            s.fill((0, 0, 0, 180))
-            game_screen.blit(s, (0, 0))
-
-            font = pygame.font.Font(None, 60)
-            if board.is_checkmate():
-                winner = "Black" if board.turn == chess.WHITE else "White"
-                msg = f"Checkmate! {winner} wins."
-            else:
-                msg = "Stalemate!"
-            text = font.render(msg, True, (255, 255, 255))
-            text_rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 40))
-            game_screen.blit(text, text_rect)
-
-            # Buttons
-            font_btn = pygame.font.Font(None, 40)
-            btn_w = 120
-            btn_h = 50
-            new_rect = pygame.Rect(SCREEN_WIDTH//2 - btn_w - 10, SCREEN_HEIGHT//2 + 20, btn_w, btn_h)
-            menu_rect = pygame.Rect(SCREEN_WIDTH//2 + 10, SCREEN_HEIGHT//2 + 20, btn_w, btn_h)
-            pygame.draw.rect(game_screen, (0, 150, 0), new_rect, border_radius=8)
-            pygame.draw.rect(game_screen, (150, 0, 0), menu_rect, border_radius=8)
-            new_text = font_btn.render("New", True, (255,255,255))
-            menu_text = font_btn.render("Menu", True, (255,255,255))
-            game_screen.blit(new_text, new_text.get_rect(center=new_rect.center))
-            game_screen.blit(menu_text, menu_text.get_rect(center=menu_rect.center))
-
-            mouse_buttons = pygame.mouse.get_pressed()
-            if mouse_buttons[0]:
-                mouse_pos = pygame.mouse.get_pos()
-                if new_rect.collidepoint(mouse_pos):
-                    return 'new'
-                elif menu_rect.collidepoint(mouse_pos):
-                    return 'menu'
+        # Drawing: the board layer is cached, so a still frame draws nothing;
+        # animations and pulsing hints push only the rects they touch
+        game_over = move_index.game_over
+        layer_changed = board_layer.update(board, player_color, hover_square,
+                                           moving_square(animated_moves))
+        frame_state = (selected_square, ai_thinking, game_over, sound_mgr.enabled,
+                       ai_worker.last_stats)
+        full_redraw = layer_changed or frame_state != last_frame_state
+        last_frame_state = frame_state
+
+        if full_redraw or animated_moves or selected_square is not None:
+            game_screen.blit(board_layer.surface, (0, 0))
+            dirty = []
+            for anim in animated_moves:
+                if anim.active:
+                    dirty.append(anim.dirty_rect())
+                    anim.draw(game_screen)
+
+            if selected_square is not None:
+                highlight_square(game_screen, selected_square, player_color, HIGHLIGHT, 100)
+                dirty += draw_move_hints(game_screen, move_index, selected_square, player_color,
+                                         pygame.time.get_ticks())
+
+            if full_redraw:
+                panel.draw(game_screen, board, depth, ai_color, player_color, sound_mgr,
+                           move_time, ai_worker.last_stats)
+
+            # AI thinking message
+            if ai_thinking:
+                text = render_text("AI is thinking...", 36, (0, 0, 0))
+                text_rect = text.get_rect(center=(BOARD_WIDTH//2, HEIGHT//2))
+                s = pygame.Surface((text_rect.width+20, text_rect.height+10), pygame.SRCALPHA)
+                s.fill((255, 255, 255, 200))
+                game_screen.blit(s, (text_rect.x-10, text_rect.y-5))
+                game_screen.blit(text, text_rect)
+
+            # Game over popup; only the board half is re-blitted on partial
+            # frames, so the dimming is redrawn there rather than over the panel
+            if game_over:
+                s = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+                s.fill((0, 0, 0, 180))
+                game_screen.blit(s, (0, 0), None if full_redraw else (0, 0, BOARD_WIDTH, HEIGHT))
+                draw_game_over(game_screen, board)
+
+            if full_redraw:
+                pygame.display.flip()
+            elif dirty:
+                pygame.display.update(dirty)
 
-        pygame.display.flip()
         clock.tick(FPS)
 
+    journal.close()
     return 'menu'
\ No newline at end of file
@@ -0,0 +1,303 @@
+"""
+Engine-vs-engine self-play across a process pool, with a running Elo
+estimate and SPRT. Never imports pygame.
+
+    python -m src.match --a depth=4 --b depth=3 --games 200 --pgn games.pgn
+    python -m src.match --a movetime=200,evaluator=bitboard --b movetime=200 \\
+        --openings openings.epd --workers 4 --sprt 0 10
+
+Each opening is played twice with colours swapped. Configurations are
+comma-separated key=value lists: depth, movetime (ms), algorithm,
+evaluator, quiescence, ordering, see.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import chess
+import chess.pgn
+from settings import (
+    DEFAULT_DEPTH, MATCH_TT_SIZE_MB, MATCH_MAX_PLIES, ADJ_RESIGN_SCORE,
+    ADJ_RESIGN_PLIES, ADJ_DRAW_SCORE, ADJ_DRAW_PLIES, ADJ_DRAW_MIN_PLY
+)
+from src.ai import TranspositionTable, search_move
+
+# -----------------------------------------------------------------
+# Openings: balanced positions a few moves in
+# -----------------------------------------------------------------
+OPENINGS = [
+    "r1bqkbnr/1ppp1ppp/p1n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 0 4",  # Ruy Lopez
+    "r1bqk1nr/pppp1ppp/2n5/2b1p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4",  # Italian
+    "rnbqkb1r/1p2pppp/p2p1n2/8/3NP3/2N5/PPP2PPP/R1BQKB1R w KQkq - 0 6",  # Najdorf
+    "rnbqkb1r/pp1ppppp/5n2/2p5/4P3/2P5/PP1P1PPP/RNBQKBNR w KQkq - 1 3",  # Alapin
+    "rnbqkb1r/ppp2ppp/4pn2/3p4/3PP3/2N5/PPP2PPP/R1BQKBNR w KQkq - 2 4",  # French
+    "rn1qkbnr/pp2pppp/2p5/3pPb2/3P4/8/PPP2PPP/RNBQKBNR w KQkq - 1 4",  # Caro-Kann
+    "rnb1kbnr/ppp1pppp/8/q7/8/2N5/PPPP1PPP/R1BQKBNR w KQkq - 2 4",  # Scandinavian
+    "rnbqkb1r/ppp1pp1p/3p1np1/8/3PP3/2N5/PPP2PPP/R1BQKBNR w KQkq - 0 4",  # Pirc
+    "rnbqkb1r/ppp2ppp/4pn2/3p4/2PP4/2N5/PP2PPPP/R1BQKBNR w KQkq - 2 4",  # QGD
+    "rnbqkb1r/pp2pppp/2p2n2/3p4/2PP4/5N2/PP2PPPP/RNBQKB1R w KQkq - 2 4",  # Slav
+    "rnbqkb1r/ppp1pppp/5n2/8/2pP4/5N2/PP2PPPP/RNBQKB1R w KQkq - 2 4",  # QGA
+    "rnbqk2r/ppp1ppbp/3p1np1/8/2PPP3/2N5/PP3PPP/R1BQKBNR w KQkq - 0 5",  # King's Indian
+    "rnbqk2r/pppp1ppp/4pn2/8/1bPP4/2N5/PP2PPPP/R1BQKBNR w KQkq - 2 4",  # Nimzo-Indian
+    "rnbqkb1r/pppp2pp/4pn2/5p2/3P4/6P1/PPP1PPBP/RNBQK1NR w KQkq - 0 4",  # Dutch
+    "rnbqkb1r/ppp2ppp/5n2/3pp3/2P5/2N3P1/PP1PPP1P/R1BQKBNR w KQkq - 0 4",  # English
+    "rnbqkb1r/pp2pppp/2p2n2/3p4/8/5NP1/PPPPPPBP/RNBQK2R w KQkq - 0 4",  # Reti
+]
+
+def load_openings(path):
+    """FENs from a file, one per line (EPD operations after the 4th field are ignored)."""
+    openings = []
+    with open(path) as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) < 4 or line.startswith("#"):
+                continue
+            board = chess.Board(None)
+            board.set_epd(" ".join(fields))
+            openings.append(board.fen())
+    return openings
+
+# -----------------------------------------------------------------
+# Engine configurations
+# -----------------------------------------------------------------
+CONFIG_KEYS = {"depth": int, "movetime": int, "algorithm": str, "evaluator": str,
+               "quiescence": lambda v: v not in ("0", "off", "false"),
+               "ordering": lambda v: v not in ("0", "off", "false"),
+               "see": lambda v: v not in ("0", "off", "false")}
+
+def parse_config(text):
+    """'depth=4,evaluator=bitboard' -> {'depth': 4, 'evaluator': 'bitboard'}"""
+    config = {}
+    for item in filter(None, text.split(",")):
+        key, _, value = item.partition("=")
+        if key not in CONFIG_KEYS:
+            raise argparse.ArgumentTypeError(
+                f"unknown option {key!r}; expected one of {', '.join(CONFIG_KEYS)}")
+        config[key] = CONFIG_KEYS[key](value)
+    return config
+
+def config_name(config):
+    return ",".join(f"{key}={value}" for key, value in config.items()) or "default"
+
+def engine_move(board, config, tt):
+    """
+    search_move with one side's configuration; book off, private table.
+    Always serial: games already run one per worker, and root-parallel
+    tasks could not see the private table.
+    """
+    options = {key: config[key] for key in ("algorithm", "evaluator", "quiescence", "ordering", "see")
+               if key in config}
+    return search_move(board, config.get("depth", DEFAULT_DEPTH), config.get("movetime", 0),
+                       book=False, parallel=False, tt=tt, **options)
+
+# -----------------------------------------------------------------
+# One game (runs in a pool worker)
+# -----------------------------------------------------------------
+def play_game(index, fen, white, black, seed):
+    """
+    Play one game from fen. Returns a dict with the index, the start FEN,
+    the UCI moves, the result ("1-0", "0-1", "1/2-1/2") and how it ended.
+    """
+    random.seed(seed)
+    board = chess.Board(fen)
+    configs = {chess.WHITE: white, chess.BLACK: black}
+    tables = {color: TranspositionTable(MATCH_TT_SIZE_MB) for color in configs}
+    resign_run = draw_run = 0
+    resign_side = None  # side the current resign run favours
+    result, reason = "1/2-1/2", "max plies"
+    while len(board.move_stack) < MATCH_MAX_PLIES:
+        outcome = board.outcome(claim_draw=True)
+        if outcome is not None:
+            result, reason = outcome.result(), outcome.termination.name.lower()
+            break
+        move, stats = engine_move(board, configs[board.turn], tables[board.turn])
+        board.push(move)
+
+        # Adjudication, on scores from White's perspective: a win needs
+        # consecutive scores that favour the same side
+        score = stats.score
+        if score is None:
+            resign_run = draw_run = 0
+            continue
+        if abs(score) >= ADJ_RESIGN_SCORE:
+            side = score > 0
+            resign_run = resign_run + 1 if side == resign_side else 1
+            resign_side = side
+        else:
+            resign_run = 0
+            resign_side = None
+        draw_run = draw_run + 1 if abs(score) <= ADJ_DRAW_SCORE else 0
+        if resign_run >= ADJ_RESIGN_PLIES:
+            result, reason = ("1-0" if resign_side else "0-1"), "adjudicated win"
+            break
+        if draw_run >= ADJ_DRAW_PLIES and board.ply() >= ADJ_DRAW_MIN_PLY:
+            result, reason = "1/2-1/2", "adjudicated draw"
+            break
+    return {"index": index, "fen": fen, "moves": [move.uci() for move in board.move_stack],
+            "result": result, "reason": reason}
+
+# -----------------------------------------------------------------
+# Statistics
+# -----------------------------------------------------------------
+def score_stats(wins, draws, losses):
+    """Mean score per game and its per-game variance, from A's side."""
+    n = wins + draws + losses
+    mean = (wins + draws / 2) / n
+    variance = (wins * (1 - mean) ** 2 + draws * (0.5 - mean) ** 2 + losses * mean ** 2) / n
+    return mean, variance
+
+def elo(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+def elo_estimate(wins, draws, losses):
+    """(Elo difference, 95% error margin) of A over B."""
+    n = wins + draws + losses
+    mean, variance = score_stats(wins, draws, losses)
+    margin = 1.96 * math.sqrt(variance / n)
+    return elo(mean), (elo(mean + margin) - elo(mean - margin)) / 2
+
+def sprt_llr(wins, draws, losses, elo0, elo1):
+    """
+    Log-likelihood ratio of H1 (A is elo1 stronger) over H0 (elo0), using
+    the normal approximation to the trinomial game results.
+    """
+    n = wins + draws + losses
+    mean, variance = score_stats(wins, draws, losses)
+    if variance == 0:
+        return 0.0
+    s0 = 1 / (1 + 10 ** (-elo0 / 400))
+    s1 = 1 / (1 + 10 ** (-elo1 / 400))
+    return n * (s1 - s0) * (2 * mean - s0 - s1) / (2 * variance)
+
+def sprt_bounds(alpha, beta):
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+# -----------------------------------------------------------------
+# Match driver
+# -----------------------------------------------------------------
+def write_pgn(f, game, names, round_number):
+    board = chess.Board(game["fen"])
+    for uci in game["moves"]:
+        board.push_uci(uci)
+    pgn = chess.pgn.Game.from_board(board)
+    pgn.headers["Event"] = "Self-play"
+    pgn.headers["Round"] = str(round_number)
+    pgn.headers["White"], pgn.headers["Black"] = names
+    pgn.headers["Result"] = game["result"]
+    pgn.headers["Termination"] = game["reason"]
+    print(pgn, file=f, end="\n\n")
+    f.flush()
+
+def run_match(config_a, config_b, games, openings=OPENINGS, workers=None, pgn_path=None,
+              sprt=None, alpha=0.05, beta=0.05):
+    """
+    Play games between A and B, printing a running tally, Elo and, when
+    sprt=(elo0, elo1) is given, the SPRT log-likelihood ratio; stops early
+    once SPRT decides. Returns the summary dict.
+    """
+    workers = workers or os.cpu_count() or 1
+    name_a, name_b = f"A: {config_name(config_a)}", f"B: {config_name(config_b)}"
+    bounds = sprt_bounds(alpha, beta) if sprt else None
+    wins = draws = losses = 0
+    reasons = {}
+    verdict = None
+
+    mp_context = multiprocessing.get_context("spawn")
+    pgn_file = open(pgn_path, "a") if pgn_path else None
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as pool:
+        futures = {}
+        for index in range(games):
+            fen = openings[(index // 2) % len(openings)]
+            a_white = index % 2 == 0
+            white, black = (config_a, config_b) if a_white else (config_b, config_a)
+            future = pool.submit(play_game, index, fen, white, black, index)
+            futures[future] = a_white
+
+        for future in as_completed(futures):
+            game = future.result()
+            a_white = futures[future]
+            names = (name_a, name_b) if a_white else (name_b, name_a)
+            if pgn_file:
+                write_pgn(pgn_file, game, names, game["index"] + 1)
+
+            result = game["result"]
+            if result == "1/2-1/2":
+                draws += 1
+            elif (result == "1-0") == a_white:
+                wins += 1
+            else:
+                losses += 1
+            reasons[game["reason"]] = reasons.get(game["reason"], 0) + 1
+
+            played = wins + draws + losses
+            minutes = (time.perf_counter() - start) / 60
+            diff, margin = elo_estimate(wins, draws, losses)
+            line = (f"{played:>5}/{games} +{wins} ={draws} -{losses}  "
+                    f"Elo {diff:+.1f} ± {margin:.1f}  {played / minutes:.1f} games/min")
+            if sprt:
+                llr = sprt_llr(wins, draws, losses, *sprt)
+                line += f"  LLR {llr:+.2f} [{bounds[0]:+.2f}, {bounds[1]:+.2f}]"
+                if llr >= bounds[1]:
+                    verdict = "H1 accepted"
+                elif llr <= bounds[0]:
+                    verdict = "H0 accepted"
+            print(line, flush=True)
+            if verdict:
+                for pending in futures:
+                    pending.cancel()
+                break
+
+    if pgn_file:
+        pgn_file.close()
+    elapsed = time.perf_counter() - start
+    played = wins + draws + losses
+    diff, margin = elo_estimate(wins, draws, losses)
+    summary = {
+        "a": config_a, "b": config_b, "games": played,
+        "wins": wins, "draws": draws, "losses": losses,
+        "score": round((wins + draws / 2) / played, 4),
+        "elo": round(diff, 1), "elo_margin": round(margin, 1),
+        "terminations": reasons, "workers": workers,
+        "seconds": round(elapsed, 1), "games_per_minute": round(played * 60 / elapsed, 2),
+    }
+    if sprt:
+        summary["sprt"] = {"elo0": sprt[0], "elo1": sprt[1], "alpha": alpha, "beta": beta,
+                           "llr": round(sprt_llr(wins, draws, losses, *sprt), 3),
+                           "verdict": verdict or "inconclusive"}
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Engine-vs-engine self-play match")
+    parser.add_argument("--a", type=parse_config, default={}, help="engine A, e.g. depth=4")
+    parser.add_argument("--b", type=parse_config, default={}, help="engine B, e.g. depth=3")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--openings", help="file of FENs/EPDs, one per line")
+    parser.add_argument("--pgn", help="append finished games to this PGN file")
+    parser.add_argument("--summary", help="write the final summary as JSON to this file")
+    parser.add_argument("--sprt", type=float, nargs=2, metavar=("ELO0", "ELO1"),
+                        help="stop once SPRT accepts elo0 or elo1")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    args = parser.parse_args(argv)
+    if args.a == args.b:
+        parser.error(f"--a and --b are the same engine ({config_name(args.a)})")
+
+    openings = load_openings(args.openings) if args.openings else OPENINGS
+    print(f"A: {config_name(args.a)}  B: {config_name(args.b)}  "
+          f"{args.games} games, {len(openings)} openings, {args.workers} workers")
+    summary = run_match(args.a, args.b, args.games, openings, args.workers, args.pgn,
+                        args.sprt, args.alpha, args.beta)
+    print(json.dumps(summary, indent=4))
+    if args.summary:
+        with open(args.summary, "w") as f:
+            json.dump(summary, f, indent=4)
+
+if __name__ == "__main__":
+    main()
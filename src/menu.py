@@ -2,14 +2,18 @@ import pygame
 import chess
 from settings import (
     WIDTH, HEIGHT, MENU_BG, BUTTON_COLOR, BUTTON_HOVER, TEXT_COLOR, TITLE_COLOR,
-    MIN_DEPTH, MAX_DEPTH, DEFAULT_DEPTH
+    MIN_DEPTH, MAX_DEPTH, DEFAULT_DEPTH, AI_MOVE_TIME, MOVE_TIME_CHOICES, FPS, SAVE_SLOTS
 )
-from src.save_load import load_game
-
-def draw_button(screen, text, x, y, w, h, inactive_color, active_color, action=None):
-    """Draw a button with relative coordinates (x,y) as top-left."""
+from src.save_load import load_game, slot_exists
+from src.text import render_text
+from src.utils import next_events
+
+def draw_button(screen, text, x, y, w, h, inactive_color, active_color, action=None, click=None):
+    """
+    Draw a button with relative coordinates (x,y) as top-left. Returns True
+    if click, the position of this frame's left click, if any, is on it.
+    """
     mouse = pygame.mouse.get_pos()
-    click = pygame.mouse.get_pressed()
     rect = pygame.Rect(x, y, w, h)
 
     hovered = rect.collidepoint(mouse)
@@ -18,31 +22,31 @@ def draw_button(screen, text, x, y, w, h, inactive_color, active_color, action=N
     if hovered:
         pygame.draw.rect(screen, (255, 255, 255), rect, 2, border_radius=8)
 
-    font = pygame.font.Font(None, 36)
-    text_surf = font.render(text, True, TEXT_COLOR)
+    text_surf = render_text(text, 36, TEXT_COLOR)
     text_rect = text_surf.get_rect(center=rect.center)
     screen.blit(text_surf, text_rect)
 
-    if hovered and click[0] == 1 and action is not None:
-        pygame.time.wait(200)
-        return True
-    return False
+    return action is not None and click is not None and rect.collidepoint(click)
 
 def run_menu(screen, clock):
     """Responsive menu – all positions relative to WIDTH, HEIGHT."""
     depth = DEFAULT_DEPTH
+    move_time = AI_MOVE_TIME
     player_side = 'white'
     dragging = False
 
     # Responsive layout calculations
-    title_y = int(HEIGHT * 0.1)
-    label_y = int(HEIGHT * 0.22)
-    slider_y = int(HEIGHT * 0.32)
-    depth_text_y = int(HEIGHT * 0.42)
-    side_label_y = int(HEIGHT * 0.52)
-    side_btn_y = int(HEIGHT * 0.60)
-    side_text_y = int(HEIGHT * 0.70)
+    title_y = int(HEIGHT * 0.08)
+    label_y = int(HEIGHT * 0.18)
+    slider_y = int(HEIGHT * 0.27)
+    depth_text_y = int(HEIGHT * 0.32)
+    time_btn_y = int(HEIGHT * 0.39)
+    side_label_y = int(HEIGHT * 0.50)
+    side_btn_y = int(HEIGHT * 0.57)
+    side_text_y = int(HEIGHT * 0.67)
     action_btn_y = int(HEIGHT * 0.80)
+    title_size = int(WIDTH * 0.1)
+    label_size = int(WIDTH * 0.045)
 
     # Slider dimensions (responsive)
     slider_w = int(WIDTH * 0.45)
@@ -54,19 +58,61 @@ def run_menu(screen, clock):
         nonlocal player_side
         player_side = side
 
+    def next_move_time():
+        nonlocal move_time
+        choices = MOVE_TIME_CHOICES
+        index = choices.index(move_time) if move_time in choices else -1
+        move_time = choices[(index + 1) % len(choices)]
+
+    def next_slot():
+        nonlocal slot, saved_exists
+        slot = (slot + 1) % SAVE_SLOTS
+        saved_exists = slot_exists(slot)
+
+    slot = 0
+    saved_exists = slot_exists(slot)
+    depth_range = MAX_DEPTH - MIN_DEPTH
+    redraw = True
+
     menu_running = True
     while menu_running:
+        handle_x = slider_x + (depth - MIN_DEPTH) * slider_w // depth_range
+        handle_y = slider_y + slider_h // 2
+
+        # Events: nothing in the menu animates, so sleep until input arrives
+        events = [] if redraw else next_events()
+        if not events and not redraw:
+            continue
+        click = None
+        for event in events:
+            if event.type == pygame.QUIT:
+                return None
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button == 1:
+                    click = event.pos
+                    # Check if click on handle
+                    mouse_x, mouse_y = event.pos
+                    dist = ((mouse_x - handle_x) ** 2 + (mouse_y - handle_y) ** 2) ** 0.5
+                    if dist <= handle_radius + 5:
+                        dragging = True
+            elif event.type == pygame.MOUSEBUTTONUP:
+                if event.button == 1:
+                    dragging = False
+            elif event.type == pygame.MOUSEMOTION:
+                if dragging:
+                    mouse_x, _ = event.pos
+                    mouse_x = max(slider_x, min(slider_x + slider_w, mouse_x))
+                    depth = MIN_DEPTH + (mouse_x - slider_x) * depth_range // slider_w
+
         screen.fill(MENU_BG)
 
         # Title
-        font_title = pygame.font.Font(None, int(WIDTH * 0.1))
-        title = font_title.render("Chess AI", True, TITLE_COLOR)
+        title = render_text("Chess AI", title_size, TITLE_COLOR)
         title_rect = title.get_rect(center=(WIDTH//2, title_y))
         screen.blit(title, title_rect)
 
         # Subtitle
-        font_label = pygame.font.Font(None, int(WIDTH * 0.045))
-        label = font_label.render("Adjust AI Strength (Search Depth)", True, TEXT_COLOR)
+        label = render_text("Adjust AI Strength (Search Depth)", label_size, TEXT_COLOR)
         screen.blit(label, (WIDTH//2 - label.get_width()//2, label_y))
 
         # Slider track
@@ -74,18 +120,33 @@ def run_menu(screen, clock):
         pygame.draw.rect(screen, (100, 100, 100), (slider_x, slider_y, slider_w, slider_h), 2, border_radius=5)
 
         # Handle position
-        depth_range = MAX_DEPTH - MIN_DEPTH
         handle_x = slider_x + (depth - MIN_DEPTH) * slider_w // depth_range
         handle_y = slider_y + slider_h // 2
         pygame.draw.circle(screen, BUTTON_COLOR, (handle_x, handle_y), handle_radius)
         pygame.draw.circle(screen, BUTTON_HOVER, (handle_x, handle_y), handle_radius-2)
 
         # Depth display
-        depth_text = font_label.render(f"Depth: {depth}", True, BUTTON_COLOR)
+        depth_text = render_text(f"Depth: {depth}", label_size, BUTTON_COLOR)
         screen.blit(depth_text, (WIDTH//2 - depth_text.get_width()//2, depth_text_y))
 
+        # Time per move (cycles through MOVE_TIME_CHOICES; Off = fixed depth)
+        # and save slot, side by side
+        time_text = f"Time/move: {move_time / 1000:g}s" if move_time else "Time/move: Off"
+        time_btn_w = int(WIDTH * 0.30)
+        slot_btn_w = int(WIDTH * 0.18)
+        option_spacing = int(WIDTH * 0.03)
+        time_x = (WIDTH - time_btn_w - slot_btn_w - option_spacing) // 2
+        if draw_button(screen, time_text, time_x, time_btn_y,
+                       time_btn_w, int(HEIGHT * 0.06),
+                       BUTTON_COLOR, BUTTON_HOVER, action=next_move_time, click=click):
+            next_move_time()
+        if draw_button(screen, f"Slot: {slot + 1}", time_x + time_btn_w + option_spacing,
+                       time_btn_y, slot_btn_w, int(HEIGHT * 0.06),
+                       BUTTON_COLOR, BUTTON_HOVER, action=next_slot, click=click):
+            next_slot()
+
         # Side selection
-        label2 = font_label.render("You play as:", True, TEXT_COLOR)
+        label2 = render_text("You play as:", label_size, TEXT_COLOR)
         screen.blit(label2, (WIDTH//2 - label2.get_width()//2, side_label_y))
 
         # Button dimensions (responsive)
@@ -96,14 +157,14 @@ def run_menu(screen, clock):
         black_x = WIDTH//2 + btn_spacing//2
 
         if draw_button(screen, "White", white_x, side_btn_y, btn_w, btn_h,
-                       BUTTON_COLOR, BUTTON_HOVER, action=lambda: set_side('white')):
+                       BUTTON_COLOR, BUTTON_HOVER, action=lambda: set_side('white'), click=click):
             set_side('white')
         if draw_button(screen, "Black", black_x, side_btn_y, btn_w, btn_h,
-                       BUTTON_COLOR, BUTTON_HOVER, action=lambda: set_side('black')):
+                       BUTTON_COLOR, BUTTON_HOVER, action=lambda: set_side('black'), click=click):
             set_side('black')
 
-        side_text = font_label.render(f"Current: {player_side.capitalize()}",
-                                      True, BUTTON_COLOR)
+        side_text = render_text(f"Current: {player_side.capitalize()}", label_size,
+                                BUTTON_COLOR)
         screen.blit(side_text, (WIDTH//2 - side_text.get_width()//2, side_text_y))
 
         # Action buttons (New, Load, Quit)
@@ -114,58 +175,38 @@ def run_menu(screen, clock):
         start_x = (WIDTH - total_width) // 2
 
         new_btn = draw_button(screen, "NEW GAME", start_x, action_btn_y, action_btn_w, action_btn_h,
-                              (0, 150, 0), (0, 200, 0), action="new")
+                              (0, 150, 0), (0, 200, 0), action="new", click=click)
         load_btn = draw_button(screen, "LOAD GAME", start_x + action_btn_w + action_spacing,
                                action_btn_y, action_btn_w, action_btn_h,
-                               BUTTON_COLOR, BUTTON_HOVER, action="load")
+                               BUTTON_COLOR, BUTTON_HOVER, action="load", click=click)
         quit_btn = draw_button(screen, "QUIT", start_x + 2*(action_btn_w + action_spacing),
                                action_btn_y, action_btn_w, action_btn_h,
-                               (150, 0, 0), (200, 0, 0), action="quit")
+                               (150, 0, 0), (200, 0, 0), action="quit", click=click)
 
-        # Check if save exists
-        saved_exists = load_game() is not None
+        # Grey out load button when there is no save
         if not saved_exists:
-            # Grey out load button
             load_rect = pygame.Rect(start_x + action_btn_w + action_spacing,
                                     action_btn_y, action_btn_w, action_btn_h)
             pygame.draw.rect(screen, (150, 150, 150), load_rect, border_radius=8)
-            load_text = font_label.render("LOAD GAME", True, (100, 100, 100))
+            load_text = render_text("LOAD GAME", label_size, (100, 100, 100))
             load_text_rect = load_text.get_rect(center=load_rect.center)
             screen.blit(load_text, load_text_rect)
 
-        # Events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return None
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:
-                    # Check if click on handle
-                    mouse_x, mouse_y = event.pos
-                    dist = ((mouse_x - handle_x) ** 2 + (mouse_y - handle_y) ** 2) ** 0.5
-                    if dist <= handle_radius + 5:
-                        dragging = True
-            elif event.type == pygame.MOUSEBUTTONUP:
-                if event.button == 1:
-                    dragging = False
-            elif event.type == pygame.MOUSEMOTION:
-                if dragging:
-                    mouse_x, _ = event.pos
-                    mouse_x = max(slider_x, min(slider_x + slider_w, mouse_x))
-                    depth = MIN_DEPTH + (mouse_x - slider_x) * depth_range // slider_w
-
         # Button actions
         if new_btn:
             ai_color = chess.BLACK if player_side == 'white' else chess.WHITE
             player_color = chess.WHITE if player_side == 'white' else chess.BLACK
-            return depth, ai_color, player_color, None
+            return depth, ai_color, player_color, None, move_time, slot
 
         if load_btn and saved_exists:
-            loaded = load_game()
+            loaded = load_game(slot)
             if loaded:
-                return loaded
+                return loaded + (slot,)
 
         if quit_btn:
             return None
 
         pygame.display.flip()
-        clock.tick(60)
\ No newline at end of file
+        # A click may have changed a setting drawn above it; show it right away
+        redraw = click is not None
+        clock.tick(FPS)
\ No newline at end of file
@@ -1,18 +1,213 @@
 import json
+import os
 import chess
-from settings import SAVE_FILE
-
-def save_game(board, depth, ai_color, player_color):
-    data = {
-        "fen": board.fen(),
-        "depth": depth,
-        "ai_color": ai_color,
-        "player_color": player_color
-    }
-    with open(SAVE_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
-def load_game():
+from settings import SAVE_DIR, SAVE_FILE, JOURNAL_SYNC_EVERY, AI_MOVE_TIME
+
+# -----------------------------------------------------------------
+# Save slots: an append-only journal plus an optional checkpoint each
+#
+#   slotN.journal     "G {settings}" header line, then one move per line in UCI
+#   slotN.json        checkpoint: settings, start FEN, every move so far and
+#                     the journal offset it covers; written atomically
+#   slotN.journal.new a new game not yet saved; it replaces the slot's
+#                     journal (and drops its checkpoint) on checkpoint/close
+#
+# Loading reads the checkpoint (if any) and replays the journal after it.
+# -----------------------------------------------------------------
+def journal_path(slot):
+    return os.path.join(SAVE_DIR, f"slot{slot}.journal")
+
+def new_journal_path(slot):
+    return journal_path(slot) + ".new"
+
+def checkpoint_path(slot):
+    return os.path.join(SAVE_DIR, f"slot{slot}.json")
+
+def _write_atomic(path, data):
+    """Write data to path so readers see either the old file or the new one, never half."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _settings(depth, ai_color, player_color, move_time):
+    return {"depth": depth, "ai_color": ai_color, "player_color": player_color,
+            "move_time": move_time}
+
+class GameJournal:
+    """
+    Records one game into a save slot as it is played: each move is one
+    short appended line, so saving costs O(1) per move. Lines are fsynced
+    in batches of JOURNAL_SYNC_EVERY and on sync()/checkpoint()/close().
+
+    A resumed game appends to the slot's existing journal. A new one is
+    written to a separate file and only replaces the slot's save on
+    checkpoint() or close(). rollback() undoes everything recorded since
+    start() and leaves the slot as it was.
+    """
+    def __init__(self, slot=0):
+        self.slot = slot
+        self._file = None
+        self._pending = 0
+        self._settings = None
+        self._header = None         # lines to write before the first move of a new game
+        self._new = False           # _file is a new game's journal, not yet the slot's
+        self._session_start = None  # journal size when a resumed game was opened
+
+    def start(self, board, depth, ai_color, player_color, move_time=AI_MOVE_TIME, resume=False):
+        """Begin recording board's game; resume=True if it was loaded from this slot."""
+        self.close()
+        self._settings = _settings(depth, ai_color, player_color, move_time)
+        self._header = None
+        self._new = False
+        self._session_start = None
+        if resume and os.path.exists(journal_path(self.slot)):
+            self._file = open(journal_path(self.slot), "r+b")
+            self._session_start = _trim_torn_tail(self._file)
+        else:
+            header = dict(self._settings, fen=board.root().fen())
+            self._header = ["G " + json.dumps(header)] + [move.uci() for move in board.move_stack]
+
+    def record(self, move):
+        if self._file is None:
+            self._open_new()
+        self._file.write(move.uci().encode() + b"\n")
+        self._pending += 1
+        if self._pending >= JOURNAL_SYNC_EVERY:
+            self.sync()
+
+    def _open_new(self):
+        """Start the new game's journal beside the slot's, which stays untouched."""
+        os.makedirs(SAVE_DIR, exist_ok=True)
+        self._file = open(new_journal_path(self.slot), "wb")
+        self._file.write(("\n".join(self._header) + "\n").encode())
+        self._header = None
+        self._new = True
+        self.sync()
+
+    def _replace_slot(self):
+        """Make the new game's journal the slot's, dropping the old save."""
+        self.sync()
+        self._file.close()
+        # Drop the old checkpoint first: its offset means nothing in the new journal
+        if os.path.exists(checkpoint_path(self.slot)):
+            os.remove(checkpoint_path(self.slot))
+        os.replace(new_journal_path(self.slot), journal_path(self.slot))
+        self._file = open(journal_path(self.slot), "ab")
+        self._new = False
+
+    def sync(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def checkpoint(self, board):
+        """Atomically save the whole game; loading then skips the journal before this point."""
+        if self._file is None:
+            self._open_new()
+        if self._new:
+            self._replace_slot()
+        self.sync()
+        save_game(board, slot=self.slot, journal_offset=self._file.tell(), **self._settings)
+
+    def close(self):
+        if self._file is not None:
+            if self._new:
+                self._replace_slot()
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def rollback(self):
+        """Forget this session's moves, leaving the slot as it was before start()."""
+        if self._file is None:
+            return
+        if self._new:
+            self._file.close()
+            self._file = None
+            self._new = False
+            os.remove(new_journal_path(self.slot))
+        else:
+            self._file.truncate(self._session_start)
+            self.close()
+
+def _trim_torn_tail(f):
+    """Cut a half-written last line off the journal open in f; returns the new end."""
+    data = f.read()
+    end = data.rfind(b"\n") + 1
+    f.truncate(end)
+    f.seek(end)
+    return end
+
+def save_game(board, depth, ai_color, player_color, move_time=AI_MOVE_TIME, slot=0,
+              journal_offset=0):
+    """Write a checkpoint holding board's full game to slot."""
+    os.makedirs(SAVE_DIR, exist_ok=True)
+    data = _settings(depth, ai_color, player_color, move_time)
+    data.update(fen=board.root().fen(), moves=[move.uci() for move in board.move_stack],
+                journal_offset=journal_offset)
+    _write_atomic(checkpoint_path(slot), data)
+
+def _replay(board, lines):
+    """Apply journal lines to board; stops at the first damaged line (e.g. a torn write)."""
+    for line in lines:
+        if not line.endswith(b"\n"):
+            break
+        try:
+            move = chess.Move.from_uci(line.strip().decode())
+        except (ValueError, UnicodeDecodeError):
+            break
+        if not board.is_legal(move):
+            break
+        board.push(move)
+
+def load_game(slot=0):
+    """
+    Rebuild the game in slot with its full move stack, so repetitions and
+    takebacks work as if it had never been left. Returns
+    (board, depth, ai_color, player_color, move_time), or None if the slot
+    is empty or unreadable.
+    """
+    try:
+        data = None
+        offset = 0
+        if os.path.exists(checkpoint_path(slot)):
+            with open(checkpoint_path(slot)) as f:
+                data = json.load(f)
+            offset = data.get("journal_offset", 0)
+        board = None
+        if data is not None:
+            board = chess.Board(data["fen"])
+            for uci in data["moves"]:
+                board.push(chess.Move.from_uci(uci))
+
+        if os.path.exists(journal_path(slot)):
+            with open(journal_path(slot), "rb") as f:
+                if data is None:
+                    header = f.readline()
+                    data = json.loads(header[2:])
+                    board = chess.Board(data["fen"])
+                else:
+                    f.seek(offset)
+                _replay(board, f)
+
+        if data is None:
+            return _load_legacy() if slot == 0 else None
+        return (
+            board,
+            data["depth"],
+            data["ai_color"],
+            data["player_color"],
+            data.get("move_time", AI_MOVE_TIME)
+        )
+    except (OSError, KeyError, ValueError):
+        return None
+
+def _load_legacy():
+    """The single-FEN save.json written by earlier versions, if present."""
     try:
         with open(SAVE_FILE, "r") as f:
             data = json.load(f)
@@ -21,7 +216,13 @@ def load_game():
             board,
             data["depth"],
             data["ai_color"],
-            data["player_color"]
+            data["player_color"],
+            data.get("move_time", AI_MOVE_TIME)
         )
     except (FileNotFoundError, KeyError, json.JSONDecodeError):
-        return None
\ No newline at end of file
+        return None
+
+def slot_exists(slot):
+    if os.path.exists(journal_path(slot)) or os.path.exists(checkpoint_path(slot)):
+        return True
+    return slot == 0 and os.path.exists(SAVE_FILE)
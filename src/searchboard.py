@@ -0,0 +1,748 @@
+"""
+Compact board for the search: bitboards plus a mailbox, integer moves and
+make/unmake with an undo stack. Only src/ai.py's search uses it; the rest
+of the program keeps chess.Board and converts at the root.
+
+    python -m src.bench perft --depth 3     # check against python-chess
+
+Moves are ints: from_square | to_square << 6 | promotion << 12.
+Legal moves are generated in the same order as python-chess's
+Board.legal_moves, so a search over either board visits the same tree.
+"""
+import chess
+import chess.polyglot
+from chess import (
+    BB_SQUARES, BB_KNIGHT_ATTACKS, BB_KING_ATTACKS, BB_PAWN_ATTACKS,
+    BB_RANK_ATTACKS, BB_FILE_ATTACKS, BB_DIAG_ATTACKS, BB_RANK_MASKS, BB_FILE_MASKS,
+    BB_DIAG_MASKS, BB_RAYS, BB_RANKS, BB_RANK_1, BB_RANK_3, BB_RANK_4, BB_RANK_5,
+    BB_RANK_6, BB_RANK_8, BB_DARK_SQUARES, BB_LIGHT_SQUARES, BB_ALL,
+    PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, WHITE, BLACK
+)
+
+# -----------------------------------------------------------------
+# Move encoding
+# -----------------------------------------------------------------
+def encode_move(move):
+    """chess.Move -> int."""
+    return move.from_square | move.to_square << 6 | (move.promotion or 0) << 12
+
+def to_move(move):
+    """int -> chess.Move."""
+    return chess.Move(move & 63, move >> 6 & 63, move >> 12 or None)
+
+PROMOTIONS = (QUEEN << 12, ROOK << 12, BISHOP << 12, KNIGHT << 12)  # python-chess order
+BACKRANKS = (BB_RANK_1 | BB_RANK_8)
+
+# -----------------------------------------------------------------
+# Polyglot Zobrist keys (same values as chess.polyglot.zobrist_hash)
+# -----------------------------------------------------------------
+_RANDOM = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+PIECE_KEYS = [[[0] * 64 for _ in range(7)] for _ in chess.COLORS]
+for _color in chess.COLORS:
+    for _piece_type in chess.PIECE_TYPES:
+        for _square in chess.SQUARES:
+            PIECE_KEYS[_color][_piece_type][_square] = \
+                _RANDOM[64 * ((_piece_type - 1) * 2 + _color) + _square]
+EP_KEYS = [_RANDOM[772 + chess.square_file(square)] for square in chess.SQUARES]
+TURN_KEY = _RANDOM[780]
+CASTLING_CORNERS = ((chess.BB_H1, 768), (chess.BB_A1, 769), (chess.BB_H8, 770), (chess.BB_A8, 771))
+ALL_CORNERS = chess.BB_A1 | chess.BB_H1 | chess.BB_A8 | chess.BB_H8
+CASTLING_KEYS = {}
+for _rights in range(16):
+    _mask = _key = 0
+    for _bit, (_corner, _index) in enumerate(CASTLING_CORNERS):
+        if _rights >> _bit & 1:
+            _mask |= _corner
+            _key ^= _RANDOM[_index]
+    CASTLING_KEYS[_mask] = _key
+
+# Castling by the rook's corner: king square, king target, rook target
+CASTLING = {
+    chess.H1: (chess.E1, chess.G1, chess.F1),
+    chess.A1: (chess.E1, chess.C1, chess.D1),
+    chess.H8: (chess.E8, chess.G8, chess.F8),
+    chess.A8: (chess.E8, chess.C8, chess.D8),
+}
+ROOK_FOR_KING_TARGET = {chess.G1: (chess.H1, chess.F1), chess.C1: (chess.A1, chess.D1),
+                        chess.G8: (chess.H8, chess.F8), chess.C8: (chess.A8, chess.D8)}
+
+PIECES = [[None] + [chess.Piece(piece_type, color) for piece_type in chess.PIECE_TYPES]
+          for color in (BLACK, WHITE)]
+
+class SearchBoard:
+    """
+    The position the search works on. Attribute names follow chess.Board
+    where they overlap (occupied_co, pawns, pieces_mask, king, turn,
+    ep_square, ...) so evaluators written for one accept the other.
+    score is the material plus piece-square evaluation in centipawns, kept
+    up to date by make/unmake; key is the Polyglot Zobrist hash.
+    """
+    __slots__ = ("squares", "bb", "occupied_co", "occupied", "turn", "castling_rights",
+                 "ep_square", "halfmove_clock", "ply_count", "score", "key", "history",
+                 "stack", "values")
+
+    def __init__(self, values):
+        self.values = values          # [color][piece_type][square] centipawns, + for White
+        self.squares = [0] * 64       # piece type on each square, 0 if empty
+        self.bb = [0] * 7             # bitboard per piece type, both colours
+        self.occupied_co = [0, 0]     # [BLACK, WHITE]
+        self.occupied = 0
+        self.turn = WHITE
+        self.castling_rights = 0      # corner squares whose rook may still castle
+        self.ep_square = None
+        self.halfmove_clock = 0
+        self.ply_count = 0
+        self.score = 0
+        self.key = 0
+        self.history = []             # keys of earlier positions, oldest first
+        self.stack = []               # undo records
+
+    @classmethod
+    def from_board(cls, board, values):
+        """Copy board's position, and the keys of its game since the last capture or pawn move."""
+        pos = cls(values)
+        for square, piece in board.piece_map().items():
+            pos.squares[square] = piece.piece_type
+            pos.bb[piece.piece_type] |= BB_SQUARES[square]
+        pos.occupied_co = [board.occupied_co[BLACK], board.occupied_co[WHITE]]
+        pos.occupied = board.occupied
+        pos.turn = board.turn
+        pos.castling_rights = board.clean_castling_rights() & ALL_CORNERS
+        pos.ep_square = board.ep_square
+        pos.halfmove_clock = board.halfmove_clock
+        pos.ply_count = board.ply()
+        pos.score = pos.compute_score()
+        pos.key = pos.compute_key()
+
+        earlier = board.copy()
+        for _ in range(min(board.halfmove_clock, len(board.move_stack))):
+            earlier.pop()
+            pos.history.append(chess.polyglot.zobrist_hash(earlier))
+        pos.history.reverse()
+        return pos
+
+    def to_board(self):
+        """chess.Board of the current position, without the move history."""
+        board = chess.Board(None)
+        for square in chess.scan_forward(self.occupied):
+            board.set_piece_at(square, self.piece_at(square))
+        board.turn = self.turn
+        board.castling_rights = self.castling_rights
+        board.ep_square = self.ep_square
+        board.halfmove_clock = self.halfmove_clock
+        board.fullmove_number = self.ply_count // 2 + 1
+        return board
+
+    def compute_key(self):
+        """Polyglot hash from scratch (make/unmake update it incrementally)."""
+        key = CASTLING_KEYS[self.castling_rights]
+        for square in chess.scan_forward(self.occupied):
+            color = bool(self.occupied_co[WHITE] & BB_SQUARES[square])
+            key ^= PIECE_KEYS[color][self.squares[square]][square]
+        if self.turn == WHITE:
+            key ^= TURN_KEY
+        if self._ep_hashed():
+            key ^= EP_KEYS[self.ep_square]
+        return key
+
+    def compute_score(self):
+        """Evaluation from scratch (make/unmake update it incrementally)."""
+        score = 0
+        for square in chess.scan_forward(self.occupied):
+            color = bool(self.occupied_co[WHITE] & BB_SQUARES[square])
+            score += self.values[color][self.squares[square]][square]
+        return score
+
+    def _ep_hashed(self):
+        """Polyglot counts the en passant square only if a pawn could take on it."""
+        return (self.ep_square is not None and
+                BB_PAWN_ATTACKS[not self.turn][self.ep_square] &
+                self.bb[PAWN] & self.occupied_co[self.turn])
+
+    # -------------------------------------------------------------
+    # chess.Board-compatible queries
+    # -------------------------------------------------------------
+    @property
+    def pawns(self):
+        return self.bb[PAWN]
+
+    @property
+    def knights(self):
+        return self.bb[KNIGHT]
+
+    @property
+    def bishops(self):
+        return self.bb[BISHOP]
+
+    @property
+    def rooks(self):
+        return self.bb[ROOK]
+
+    @property
+    def queens(self):
+        return self.bb[QUEEN]
+
+    @property
+    def kings(self):
+        return self.bb[KING]
+
+    def pieces_mask(self, piece_type, color):
+        return self.bb[piece_type] & self.occupied_co[color]
+
+    def piece_type_at(self, square):
+        return self.squares[square] or None
+
+    def piece_at(self, square):
+        piece_type = self.squares[square]
+        if not piece_type:
+            return None
+        return PIECES[bool(self.occupied_co[WHITE] & BB_SQUARES[square])][piece_type]
+
+    def king(self, color):
+        mask = self.bb[KING] & self.occupied_co[color]
+        return mask.bit_length() - 1 if mask else None
+
+    def ply(self):
+        return self.ply_count
+
+    def fen(self):
+        return self.to_board().fen()
+
+    def is_capture(self, move):
+        to_square = move >> 6 & 63
+        return bool(self.squares[to_square]) or self.is_en_passant(move)
+
+    def is_en_passant(self, move):
+        to_square = move >> 6 & 63
+        return (to_square == self.ep_square and self.squares[move & 63] == PAWN
+                and not self.squares[to_square] and (to_square - (move & 63)) % 8 != 0)
+
+    # -------------------------------------------------------------
+    # Attacks
+    # -------------------------------------------------------------
+    def attacks_mask(self, square):
+        piece_type = self.squares[square]
+        if piece_type == KNIGHT:
+            return BB_KNIGHT_ATTACKS[square]
+        if piece_type == KING:
+            return BB_KING_ATTACKS[square]
+        if piece_type == PAWN:
+            return BB_PAWN_ATTACKS[bool(self.occupied_co[WHITE] & BB_SQUARES[square])][square]
+        occupied = self.occupied
+        attacks = 0
+        if piece_type != ROOK:
+            attacks = BB_DIAG_ATTACKS[square][BB_DIAG_MASKS[square] & occupied]
+        if piece_type != BISHOP:
+            attacks |= (BB_RANK_ATTACKS[square][BB_RANK_MASKS[square] & occupied] |
+                        BB_FILE_ATTACKS[square][BB_FILE_MASKS[square] & occupied])
+        return attacks
+
+    def attackers_mask(self, color, square, occupied=None):
+        """Pieces of color attacking square, sliders seeing through anything not in occupied."""
+        if occupied is None:
+            occupied = self.occupied
+        bb = self.bb
+        queens_and_rooks = bb[QUEEN] | bb[ROOK]
+        queens_and_bishops = bb[QUEEN] | bb[BISHOP]
+        attackers = (
+            (BB_KING_ATTACKS[square] & bb[KING]) |
+            (BB_KNIGHT_ATTACKS[square] & bb[KNIGHT]) |
+            (BB_RANK_ATTACKS[square][BB_RANK_MASKS[square] & occupied] & queens_and_rooks) |
+            (BB_FILE_ATTACKS[square][BB_FILE_MASKS[square] & occupied] & queens_and_rooks) |
+            (BB_DIAG_ATTACKS[square][BB_DIAG_MASKS[square] & occupied] & queens_and_bishops) |
+            (BB_PAWN_ATTACKS[not color][square] & bb[PAWN]))
+        return attackers & self.occupied_co[color] & occupied
+
+    def is_check(self):
+        king = self.king(self.turn)
+        return king is not None and bool(self.attackers_mask(not self.turn, king))
+
+    def _slider_blockers(self, king):
+        """Our pieces that are the only thing between the king and an enemy slider."""
+        bb = self.bb
+        rooks_and_queens = bb[ROOK] | bb[QUEEN]
+        bishops_and_queens = bb[BISHOP] | bb[QUEEN]
+        snipers = ((BB_RANK_ATTACKS[king][0] & rooks_and_queens) |
+                   (BB_FILE_ATTACKS[king][0] & rooks_and_queens) |
+                   (BB_DIAG_ATTACKS[king][0] & bishops_and_queens))
+        snipers &= self.occupied_co[not self.turn]
+        blockers = 0
+        occupied = self.occupied
+        while snipers:
+            sniper = snipers.bit_length() - 1
+            snipers ^= BB_SQUARES[sniper]
+            between = chess.between(king, sniper) & occupied
+            if between and between & (between - 1) == 0:
+                blockers |= between
+        return blockers & self.occupied_co[self.turn]
+
+    # -------------------------------------------------------------
+    # Move generation
+    # -------------------------------------------------------------
+    def _pseudo_legal(self, moves, from_mask, to_mask):
+        """Append pseudo-legal moves to moves in python-chess's order."""
+        turn = self.turn
+        ours = self.occupied_co[turn]
+        occupied = self.occupied
+        bb = self.bb
+        squares = self.squares
+
+        # Pieces, most significant square first
+        pieces = ours & ~bb[PAWN] & from_mask
+        targets_mask = ~ours & to_mask
+        while pieces:
+            from_square = pieces.bit_length() - 1
+            pieces ^= BB_SQUARES[from_square]
+            piece_type = squares[from_square]
+            if piece_type == KNIGHT:
+                targets = BB_KNIGHT_ATTACKS[from_square]
+            elif piece_type == KING:
+                targets = BB_KING_ATTACKS[from_square]
+            else:
+                targets = 0
+                if piece_type != ROOK:
+                    targets = BB_DIAG_ATTACKS[from_square][BB_DIAG_MASKS[from_square] & occupied]
+                if piece_type != BISHOP:
+                    targets |= (BB_RANK_ATTACKS[from_square][BB_RANK_MASKS[from_square] & occupied] |
+                                BB_FILE_ATTACKS[from_square][BB_FILE_MASKS[from_square] & occupied])
+            targets &= targets_mask
+            while targets:
+                to_square = targets.bit_length() - 1
+                targets ^= BB_SQUARES[to_square]
+                moves.append(from_square | to_square << 6)
+
+        if from_mask & bb[KING]:
+            self._castling(moves, from_mask, to_mask)
+
+        pawns = bb[PAWN] & ours & from_mask
+        if not pawns:
+            return
+
+        # Pawn captures
+        theirs = self.occupied_co[not turn] & to_mask
+        attacks = BB_PAWN_ATTACKS[turn]
+        capturers = pawns
+        while capturers:
+            from_square = capturers.bit_length() - 1
+            capturers ^= BB_SQUARES[from_square]
+            targets = attacks[from_square] & theirs
+            while targets:
+                to_square = targets.bit_length() - 1
+                targets ^= BB_SQUARES[to_square]
+                move = from_square | to_square << 6
+                if BB_SQUARES[to_square] & BACKRANKS:
+                    moves.extend(move | promotion for promotion in PROMOTIONS)
+                else:
+                    moves.append(move)
+
+        # Pushes
+        if turn == WHITE:
+            single_moves = pawns << 8 & ~occupied
+            double_moves = single_moves << 8 & ~occupied & (BB_RANK_3 | BB_RANK_4)
+            back = -8
+        else:
+            single_moves = pawns >> 8 & ~occupied
+            double_moves = single_moves >> 8 & ~occupied & (BB_RANK_6 | BB_RANK_5)
+            back = 8
+        single_moves &= to_mask
+        double_moves &= to_mask
+        while single_moves:
+            to_square = single_moves.bit_length() - 1
+            single_moves ^= BB_SQUARES[to_square]
+            move = (to_square + back) | to_square << 6
+            if BB_SQUARES[to_square] & BACKRANKS:
+                moves.extend(move | promotion for promotion in PROMOTIONS)
+            else:
+                moves.append(move)
+        while double_moves:
+            to_square = double_moves.bit_length() - 1
+            double_moves ^= BB_SQUARES[to_square]
+            moves.append((to_square + 2 * back) | to_square << 6)
+
+        if self.ep_square is not None:
+            self._pseudo_legal_ep(moves, from_mask, to_mask)
+
+    def _pseudo_legal_ep(self, moves, from_mask, to_mask):
+        ep_square = self.ep_square
+        if ep_square is None or not BB_SQUARES[ep_square] & to_mask:
+            return
+        if BB_SQUARES[ep_square] & self.occupied:
+            return
+        capturers = (self.bb[PAWN] & self.occupied_co[self.turn] & from_mask &
+                     BB_PAWN_ATTACKS[not self.turn][ep_square] &
+                     BB_RANKS[4 if self.turn else 3])
+        while capturers:
+            from_square = capturers.bit_length() - 1
+            capturers ^= BB_SQUARES[from_square]
+            moves.append(from_square | ep_square << 6)
+
+    def _castling(self, moves, from_mask, to_mask):
+        backrank = BB_RANK_1 if self.turn == WHITE else BB_RANK_8
+        candidates = self.castling_rights & backrank & to_mask
+        while candidates:
+            rook = candidates.bit_length() - 1
+            candidates ^= BB_SQUARES[rook]
+            king, king_to, rook_to = CASTLING[rook]
+            king_bb, rook_bb = BB_SQUARES[king], BB_SQUARES[rook]
+            if not (self.bb[KING] & self.occupied_co[self.turn] & king_bb & from_mask):
+                continue
+            king_to_bb, rook_to_bb = BB_SQUARES[king_to], BB_SQUARES[rook_to]
+            king_path = chess.between(king, king_to)
+            rook_path = chess.between(rook, rook_to)
+            occupied = self.occupied
+            if (occupied ^ king_bb ^ rook_bb) & (king_path | rook_path | king_to_bb | rook_to_bb):
+                continue
+            if self._attacked_for_king(king_path | king_bb, occupied ^ king_bb):
+                continue
+            if self._attacked_for_king(king_to_bb, occupied ^ king_bb ^ rook_bb ^ rook_to_bb):
+                continue
+            moves.append(king | king_to << 6)
+
+    def _attacked_for_king(self, path, occupied):
+        them = not self.turn
+        while path:
+            square = path.bit_length() - 1
+            path ^= BB_SQUARES[square]
+            if self.attackers_mask(them, square, occupied):
+                return True
+        return False
+
+    def _is_safe(self, king, blockers, move):
+        from_square = move & 63
+        to_square = move >> 6 & 63
+        if from_square == king:
+            if self.squares[from_square] == KING and abs(to_square - from_square) == 2:
+                return True  # castling, checked during generation
+            return not self.attackers_mask(not self.turn, to_square,
+                                           self.occupied ^ BB_SQUARES[king])
+        if self.is_en_passant(move):
+            captured = to_square + (-8 if self.turn == WHITE else 8)
+            occupied = (self.occupied ^ BB_SQUARES[from_square] ^ BB_SQUARES[captured]
+                        | BB_SQUARES[to_square])
+            return not self.attackers_mask(not self.turn, king, occupied)
+        return bool(not blockers & BB_SQUARES[from_square] or
+                    BB_RAYS[from_square][to_square] & BB_SQUARES[king])
+
+    def generate_legal(self, from_mask=BB_ALL, to_mask=BB_ALL):
+        """Legal moves within the masks, in python-chess's order."""
+        moves = []
+        king = self.king(self.turn)
+        if king is None:
+            self._pseudo_legal(moves, from_mask, to_mask)
+            return moves
+        blockers = self._slider_blockers(king)
+        checkers = self.attackers_mask(not self.turn, king)
+        if checkers:
+            self._evasions(moves, king, checkers, from_mask, to_mask)
+        else:
+            self._pseudo_legal(moves, from_mask, to_mask)
+        # Only king moves, pinned pieces and en passant can be unsafe
+        risky = blockers | BB_SQUARES[king]
+        if self.ep_square is not None:
+            risky |= self.bb[PAWN] & BB_PAWN_ATTACKS[not self.turn][self.ep_square]
+        return [move for move in moves
+                if not BB_SQUARES[move & 63] & risky or self._is_safe(king, blockers, move)]
+
+    def _evasions(self, moves, king, checkers, from_mask, to_mask):
+        bb = self.bb
+        sliders = checkers & (bb[BISHOP] | bb[ROOK] | bb[QUEEN])
+        attacked = 0
+        while sliders:
+            checker = sliders.bit_length() - 1
+            sliders ^= BB_SQUARES[checker]
+            attacked |= BB_RAYS[king][checker] & ~BB_SQUARES[checker]
+
+        if BB_SQUARES[king] & from_mask:
+            targets = (BB_KING_ATTACKS[king] & ~self.occupied_co[self.turn] & ~attacked &
+                       to_mask)
+            while targets:
+                to_square = targets.bit_length() - 1
+                targets ^= BB_SQUARES[to_square]
+                moves.append(king | to_square << 6)
+
+        checker = checkers.bit_length() - 1
+        if BB_SQUARES[checker] == checkers:
+            # Capture or block a single checker
+            target = chess.between(king, checker) | checkers
+            self._pseudo_legal(moves, ~bb[KING] & from_mask, target & to_mask)
+            # The checker may be a pawn that can be taken en passant
+            ep_square = self.ep_square
+            if ep_square is not None and not BB_SQUARES[ep_square] & target:
+                last_double = ep_square + (-8 if self.turn == WHITE else 8)
+                if last_double == checker:
+                    self._pseudo_legal_ep(moves, from_mask, to_mask)
+
+    def legal_moves(self):
+        return self.generate_legal()
+
+    def tactical_moves(self, moves=None):
+        """
+        Legal captures plus non-capturing promotions: picked out of moves
+        when the full list is already known, else from one generation pass.
+        """
+        if moves is None:
+            last_rank = BB_RANK_8 if self.turn == WHITE else BB_RANK_1
+            to_mask = self.occupied_co[not self.turn] | last_rank & ~self.occupied
+            if self.ep_square is not None:
+                to_mask |= BB_SQUARES[self.ep_square]
+            moves = self.generate_legal(BB_ALL, to_mask)
+        squares = self.squares
+        return [move for move in moves
+                if squares[move >> 6 & 63] or move >> 12 or self.is_en_passant(move)]
+
+    # -------------------------------------------------------------
+    # Game end
+    # -------------------------------------------------------------
+    def has_insufficient_material(self, color):
+        bb = self.bb
+        ours = self.occupied_co[color]
+        if ours & (bb[PAWN] | bb[ROOK] | bb[QUEEN]):
+            return False
+        if ours & bb[KNIGHT]:
+            return (ours.bit_count() <= 2 and
+                    not (self.occupied_co[not color] & ~bb[KING] & ~bb[QUEEN]))
+        if ours & bb[BISHOP]:
+            same_color = (not bb[BISHOP] & BB_DARK_SQUARES) or (not bb[BISHOP] & BB_LIGHT_SQUARES)
+            return bool(same_color and not bb[PAWN] and not bb[KNIGHT])
+        return True
+
+    def is_insufficient_material(self):
+        return self.has_insufficient_material(WHITE) and self.has_insufficient_material(BLACK)
+
+    def repetitions(self):
+        """Earlier occurrences of this position since the last capture or pawn move."""
+        history = self.history
+        count = 0
+        for index in range(len(history) - 2, max(-1, len(history) - 1 - self.halfmove_clock), -2):
+            if history[index] == self.key:
+                count += 1
+        return count
+
+    def is_draw(self, ply):
+        """
+        Drawn without looking at the moves: insufficient material, or a
+        repetition. ply is the distance from the search root; a position
+        seen again since the root counts at once, one from before the root
+        needs a third occurrence.
+        """
+        if self.is_insufficient_material():
+            return True
+        history = self.history
+        key = self.key
+        search_start = len(history) - ply
+        seen = 0
+        for index in range(len(history) - 2, max(-1, len(history) - 1 - self.halfmove_clock), -2):
+            if history[index] == key:
+                if index >= search_start:
+                    return True
+                seen += 1
+                if seen >= 2:
+                    return True
+        return False
+
+    def is_game_over(self):
+        """Same endings as chess.Board.is_game_over(): mate, stalemate,
+        insufficient material, the 75-move rule and fivefold repetition."""
+        if not self.generate_legal():
+            return True
+        return (self.is_insufficient_material() or self.halfmove_clock >= 150
+                or self.repetitions() >= 4)
+
+    # -------------------------------------------------------------
+    # Make / unmake
+    # -------------------------------------------------------------
+    def make(self, move):
+        from_square = move & 63
+        to_square = move >> 6 & 63
+        promotion = move >> 12
+        turn = self.turn
+        them = not turn
+        squares = self.squares
+        bb = self.bb
+        occupied_co = self.occupied_co
+        ours_values = self.values[turn]
+        from_bb, to_bb = BB_SQUARES[from_square], BB_SQUARES[to_square]
+        piece_type = squares[from_square]
+        captured = squares[to_square]
+        capture_square = to_square
+        if (piece_type == PAWN and to_square == self.ep_square and not captured
+                and (to_square - from_square) % 8 != 0):
+            # En passant: the captured pawn is behind the target square
+            captured = PAWN
+            capture_square = to_square + (-8 if turn == WHITE else 8)
+        key = self.key
+        score = self.score
+
+        self.stack.append((move, captured, capture_square, self.castling_rights, self.ep_square,
+                           self.halfmove_clock, key, score))
+        self.history.append(key)
+        if self._ep_hashed():
+            key ^= EP_KEYS[self.ep_square]
+        key ^= CASTLING_KEYS[self.castling_rights]
+
+        if captured:
+            capture_bb = BB_SQUARES[capture_square]
+            squares[capture_square] = 0
+            bb[captured] ^= capture_bb
+            occupied_co[them] ^= capture_bb
+            key ^= PIECE_KEYS[them][captured][capture_square]
+            score -= self.values[them][captured][capture_square]
+
+        # Move the piece (promoting it if needed)
+        new_type = promotion or piece_type
+        squares[from_square] = 0
+        squares[to_square] = new_type
+        bb[piece_type] ^= from_bb
+        bb[new_type] ^= to_bb
+        occupied_co[turn] ^= from_bb | to_bb
+        key ^= PIECE_KEYS[turn][piece_type][from_square] ^ PIECE_KEYS[turn][new_type][to_square]
+        score += ours_values[new_type][to_square] - ours_values[piece_type][from_square]
+
+        # Castling moves the rook too
+        if piece_type == KING and abs(to_square - from_square) == 2:
+            rook_from, rook_to = ROOK_FOR_KING_TARGET[to_square]
+            rook_bb = BB_SQUARES[rook_from] | BB_SQUARES[rook_to]
+            squares[rook_from] = 0
+            squares[rook_to] = ROOK
+            bb[ROOK] ^= rook_bb
+            occupied_co[turn] ^= rook_bb
+            key ^= PIECE_KEYS[turn][ROOK][rook_from] ^ PIECE_KEYS[turn][ROOK][rook_to]
+            score += ours_values[ROOK][rook_to] - ours_values[ROOK][rook_from]
+
+        self.occupied = occupied_co[WHITE] | occupied_co[BLACK]
+        rights = self.castling_rights & ~from_bb & ~to_bb
+        if piece_type == KING:
+            rights &= ~(BB_RANK_1 if turn == WHITE else BB_RANK_8)
+        self.castling_rights = rights
+        key ^= CASTLING_KEYS[rights]
+
+        self.ep_square = None
+        if piece_type == PAWN and abs(to_square - from_square) == 16:
+            self.ep_square = (from_square + to_square) // 2
+        if piece_type == PAWN or captured:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        self.ply_count += 1
+        self.turn = them
+        key ^= TURN_KEY
+        if self._ep_hashed():
+            key ^= EP_KEYS[self.ep_square]
+        self.key = key
+        self.score = score
+
+    def unmake(self):
+        (move, captured, capture_square, self.castling_rights, self.ep_square,
+         self.halfmove_clock, self.key, self.score) = self.stack.pop()
+        self.history.pop()
+        from_square = move & 63
+        to_square = move >> 6 & 63
+        them = self.turn
+        turn = self.turn = not them
+        self.ply_count -= 1
+        squares = self.squares
+        bb = self.bb
+        occupied_co = self.occupied_co
+        from_bb, to_bb = BB_SQUARES[from_square], BB_SQUARES[to_square]
+        new_type = squares[to_square]
+        piece_type = PAWN if move >> 12 else new_type
+
+        squares[to_square] = 0
+        squares[from_square] = piece_type
+        bb[new_type] ^= to_bb
+        bb[piece_type] ^= from_bb
+        occupied_co[turn] ^= from_bb | to_bb
+
+        if piece_type == KING and abs(to_square - from_square) == 2:
+            rook_from, rook_to = ROOK_FOR_KING_TARGET[to_square]
+            rook_bb = BB_SQUARES[rook_from] | BB_SQUARES[rook_to]
+            squares[rook_to] = 0
+            squares[rook_from] = ROOK
+            bb[ROOK] ^= rook_bb
+            occupied_co[turn] ^= rook_bb
+
+        if captured:
+            capture_bb = BB_SQUARES[capture_square]
+            squares[capture_square] = captured
+            bb[captured] ^= capture_bb
+            occupied_co[them] ^= capture_bb
+
+        self.occupied = occupied_co[WHITE] | occupied_co[BLACK]
+
+    def make_null(self):
+        """Pass the move to the other side (null-move pruning); undo with unmake_null()."""
+        key = self.key
+        self.stack.append((None, 0, None, self.castling_rights, self.ep_square,
+                           self.halfmove_clock, key, self.score))
+        self.history.append(key)
+        if self._ep_hashed():
+            key ^= EP_KEYS[self.ep_square]
+        self.ep_square = None
+        # Nothing before a pass can repeat after it, so repetition scans stop here
+        self.halfmove_clock = 0
+        self.ply_count += 1
+        self.turn = not self.turn
+        self.key = key ^ TURN_KEY
+
+    def unmake_null(self):
+        (_, _, _, self.castling_rights, self.ep_square, self.halfmove_clock, self.key,
+         self.score) = self.stack.pop()
+        self.history.pop()
+        self.ply_count -= 1
+        self.turn = not self.turn
+
+# -----------------------------------------------------------------
+# Perft
+# -----------------------------------------------------------------
+def perft(pos, depth):
+    """Leaf nodes of the legal move tree under pos, depth plies deep."""
+    moves = pos.generate_legal()
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    for move in moves:
+        pos.make(move)
+        nodes += perft(pos, depth - 1)
+        pos.unmake()
+    return nodes
+
+def board_perft(board, depth):
+    """The same count walked with python-chess, for comparison."""
+    if depth <= 1:
+        return board.legal_moves.count() if depth == 1 else 1
+    nodes = 0
+    for move in board.legal_moves:
+        board.push(move)
+        nodes += board_perft(board, depth - 1)
+        board.pop()
+    return nodes
+
+def check_against_board(pos, board, depth):
+    """
+    Walk pos and board together and raise AssertionError at the first
+    node where the legal moves (or their order), the hash, the score or
+    the game-end test differ. Slow; for the perft harness.
+    """
+    expected = [encode_move(move) for move in board.legal_moves]
+    assert pos.generate_legal() == expected, (board.fen(), "moves")
+    assert pos.key == chess.polyglot.zobrist_hash(board), (board.fen(), "key")
+    assert pos.score == pos.compute_score(), (board.fen(), "score")
+    assert pos.is_game_over() == board.is_game_over(), (board.fen(), "game over")
+    assert sorted(pos.tactical_moves()) == sorted(encode_move(m) for m in _board_tactical(board)), \
+        (board.fen(), "tactical")
+    assert pos.tactical_moves() == pos.tactical_moves(expected), (board.fen(), "tactical filter")
+    if depth <= 0:
+        return
+    for move in expected:
+        pos.make(move)
+        board.push(to_move(move))
+        check_against_board(pos, board, depth - 1)
+        board.pop()
+        pos.unmake()
+
+def _board_tactical(board):
+    moves = list(board.generate_legal_captures())
+    pawns = board.pawns & board.occupied_co[board.turn]
+    last_rank = BB_RANK_8 if board.turn == WHITE else BB_RANK_1
+    moves.extend(board.generate_legal_moves(pawns, last_rank & ~board.occupied))
+    return moves
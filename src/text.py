@@ -0,0 +1,20 @@
+import functools
+import pygame
+from settings import TEXT_CACHE_SIZE
+
+# -----------------------------------------------------------------
+# Fonts and rendered text, created once and reused across frames
+# -----------------------------------------------------------------
+_fonts = {}
+
+def get_font(size):
+    """The default font at size, loaded on first use."""
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.Font(None, size)
+    return font
+
+@functools.lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text(text, size, color):
+    """Antialiased text surface, cached by (text, size, color). Do not draw on it."""
+    return get_font(size).render(text, True, color)
@@ -0,0 +1,214 @@
+"""
+UCI front end for the engine, so GUIs and tournament tools can drive it.
+Never imports pygame.
+
+    python uci.py
+
+Supported: uci, isready, ucinewgame, setoption (Hash), position,
+go (depth, nodes, movetime, wtime/btime/winc/binc/movestogo, infinite), stop, quit.
+"""
+import sys
+import threading
+import time
+import chess
+from settings import MAX_SEARCH_DEPTH, TT_SIZE_MB, UCI_MOVES_TO_GO, UCI_MOVE_OVERHEAD
+from src import ai
+from src.book import book_move
+
+ENGINE_NAME = "Chess AI"
+ENGINE_AUTHOR = "PhungHoang1909"
+
+# -----------------------------------------------------------------
+# Command parsing
+# -----------------------------------------------------------------
+GO_INT_ARGS = ("depth", "movetime", "wtime", "btime", "winc", "binc", "movestogo", "nodes")
+
+def parse_position(tokens):
+    """Board for 'position [startpos | fen <fen>] [moves ...]' tokens."""
+    if "moves" in tokens:
+        index = tokens.index("moves")
+        tokens, moves = tokens[:index], tokens[index + 1:]
+    else:
+        moves = []
+    if tokens and tokens[0] == "fen":
+        board = chess.Board(" ".join(tokens[1:]))
+    else:
+        board = chess.Board()
+    for uci in moves:
+        board.push_uci(uci)
+    return board
+
+def parse_go(tokens):
+    """
+    Dict of the 'go' arguments, bare flags such as infinite mapping to
+    True, and a list of the arguments dropped for a non-numeric value.
+    """
+    args = {}
+    ignored = []
+    i = 0
+    while i < len(tokens):
+        name = tokens[i]
+        if name in GO_INT_ARGS and i + 1 < len(tokens):
+            try:
+                args[name] = int(tokens[i + 1])
+            except ValueError:
+                ignored.append(f"{name} {tokens[i + 1]}")
+            i += 2
+        else:
+            args[name] = True
+            i += 1
+    return args, ignored
+
+def time_budget(board, args):
+    """
+    Milliseconds to spend on this move: movetime if given, otherwise a
+    share of the remaining clock plus most of the increment. None means
+    no limit (depth-only or infinite searches, ended by depth or stop).
+    """
+    if "movetime" in args:
+        return max(1, args["movetime"] - UCI_MOVE_OVERHEAD)
+    remaining = args.get("wtime" if board.turn == chess.WHITE else "btime")
+    if remaining is None:
+        return None
+    increment = args.get("winc" if board.turn == chess.WHITE else "binc", 0)
+    moves_to_go = args.get("movestogo", UCI_MOVES_TO_GO)
+    budget = remaining / max(1, moves_to_go) + increment * 3 // 4
+    return max(1, min(budget, remaining / 2) - UCI_MOVE_OVERHEAD)
+
+# -----------------------------------------------------------------
+# Engine
+# -----------------------------------------------------------------
+class UCIEngine:
+    """
+    Reads commands on the main thread and searches on a worker thread, so
+    stop, isready and quit are answered while a search runs. The search
+    polls the stop event every 1024 nodes and then reports the best move
+    of the last completed iteration.
+    """
+    def __init__(self, output=sys.stdout):
+        self.output = output
+        self.board = chess.Board()
+        self.tt = ai.transposition_table
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def send(self, line):
+        with self._lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def handle(self, line):
+        """Act on one command line. Returns False on quit."""
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {TT_SIZE_MB} min 0 max 4096")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.stop()
+            if self.tt is not None:
+                self.tt.clear()
+        elif command == "setoption":
+            self.stop()
+            self.set_option(args)
+        elif command == "position":
+            self.stop()
+            try:
+                self.board = parse_position(args)
+            except ValueError as e:
+                self.send(f"info string invalid position: {e}")
+        elif command == "go":
+            args, ignored = parse_go(args)
+            for arg in ignored:
+                self.send(f"info string ignoring go {arg}: not a number")
+            self.go(args)
+        elif command == "stop":
+            self.stop()
+        elif command == "quit":
+            self.stop()
+            return False
+        elif command == "d":
+            self.send(str(self.board))
+            self.send(f"Fen: {self.board.fen()}")
+        else:
+            self.send(f"info string unknown command: {command}")
+        return True
+
+    def set_option(self, tokens):
+        if "name" not in tokens or "value" not in tokens:
+            return
+        name = " ".join(tokens[tokens.index("name") + 1:tokens.index("value")])
+        value = " ".join(tokens[tokens.index("value") + 1:])
+        if name.lower() == "hash":
+            try:
+                size_mb = int(value)
+            except ValueError:
+                self.send(f"info string ignoring Hash value {value!r}: not a number")
+                return
+            self.tt = ai.TranspositionTable(size_mb) if size_mb > 0 else None
+
+    def go(self, args):
+        self.stop()
+        self._stop.clear()
+        board = self.board.copy()
+        self._thread = threading.Thread(target=self.search, args=(board, args), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the running search, if any, and wait for its bestmove."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def search(self, board, args):
+        """Worker thread: pick a move for board and send bestmove."""
+        move = None
+        if not args.get("infinite"):
+            move = book_move(board)
+        if move is None and not board.is_game_over():
+            budget = time_budget(board, args)
+            max_depth = min(args.get("depth", MAX_SEARCH_DEPTH), MAX_SEARCH_DEPTH)
+            ctx = ai.SearchContext(board, tt=self.tt, stop=self._stop,
+                                   node_limit=args.get("nodes"))
+            move = ai.get_timed_move(board, float("inf") if budget is None else budget,
+                                     max_depth, ctx,
+                                     report=lambda ctx, move: self.report(board, ctx, move))
+            if move is None:
+                # Stopped inside depth 1; any legal move beats none
+                move = next(iter(board.legal_moves))
+                self.send(f"info string no move searched, playing {move.uci()}")
+        if args.get("infinite"):
+            # UCI: an infinite search reports only after stop
+            self._stop.wait()
+        self.send(f"bestmove {move.uci() if move else '0000'}")
+
+    def report(self, board, ctx, move):
+        """UCI info line for a completed iteration."""
+        elapsed = time.perf_counter() - ctx.started
+        nodes = ctx.nodes + ctx.qnodes
+        sign = 1 if board.turn == chess.WHITE else -1
+        mate = ai.mate_in(ctx.score)
+        score = f"mate {sign * mate}" if mate is not None else f"cp {round(sign * ctx.score * 100)}"
+        pv = ai.principal_variation(board, move, ctx.tt, ctx.depth)
+        self.send(f"info depth {ctx.depth} seldepth {ctx.max_ply} "
+                  f"score {score} nodes {nodes} "
+                  f"nps {int(nodes / elapsed) if elapsed else 0} "
+                  f"time {int(elapsed * 1000)} pv {' '.join(m.uci() for m in pv)}")
+
+def main():
+    engine = UCIEngine()
+    for line in sys.stdin:
+        if not engine.handle(line):
+            break
+    engine.stop()
+
+if __name__ == "__main__":
+    main()
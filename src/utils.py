@@ -1,5 +1,6 @@
+import pygame
 import chess
-from settings import SQUARE_SIZE
+from settings import SQUARE_SIZE, IDLE_WAIT
 
 def get_square_from_mouse(pos, perspective):
     """Convert mouse coordinates to chess square index, respecting board flip."""
@@ -28,6 +29,45 @@ def square_to_coords(square, perspective):
         col = 7 - file
     return col * SQUARE_SIZE, row * SQUARE_SIZE
 
+def next_events(wait=IDLE_WAIT):
+    """
+    Pending events. With wait=0 return at once, for frames that animate;
+    otherwise block until an event arrives or wait ms pass, so an idle
+    window costs no CPU.
+    """
+    if wait <= 0:
+        return pygame.event.get()
+    event = pygame.event.wait(wait)
+    if event.type == pygame.NOEVENT:
+        return []
+    return [event] + pygame.event.get()
+
 def lerp(a, b, t):
     """Linear interpolation."""
-    return a + (b - a) * t
\ No newline at end of file
+    return a + (b - a) * t
+
+class MoveIndex:
+    """
+    The legal moves of one position grouped by from-square, built once per
+    position so drawing and click handling don't regenerate them per frame.
+    Rebuild it after every push or pop.
+    """
+    def __init__(self, board):
+        self.targets = {}  # from square -> {to square: [moves, one per promotion piece]}
+        for move in board.legal_moves:
+            self.targets.setdefault(move.from_square, {}).setdefault(move.to_square, []).append(move)
+        self.game_over = board.is_game_over()
+
+    def destinations(self, from_square):
+        """Squares the piece on from_square can move to."""
+        return list(self.targets.get(from_square, ()))
+
+    def move(self, from_square, to_square, promotion=chess.QUEEN):
+        """The legal move from -> to (promoting to promotion if it promotes), or None."""
+        moves = self.targets.get(from_square, {}).get(to_square)
+        if not moves:
+            return None
+        for move in moves:
+            if move.promotion in (None, promotion):
+                return move
+        return moves[0]
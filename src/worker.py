@@ -0,0 +1,179 @@
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+import chess
+from settings import STATS_LOG
+from src.ai import search_move, predict_reply, shutdown_search_pool
+
+# -----------------------------------------------------------------
+# Worker process side
+# -----------------------------------------------------------------
+_stop_event = None
+
+def _init_worker(stop_event):
+    global _stop_event
+    _stop_event = stop_event
+
+def search_position(fen, moves, depth, move_time):
+    """
+    Rebuild the game from its start FEN and UCI moves, then search it.
+    Returns (move, expected reply, seconds spent, stats dict), moves as
+    UCI strings.
+    """
+    start = time.perf_counter()
+    board = chess.Board(fen)
+    for uci in moves:
+        board.push_uci(uci)
+    move, stats = search_move(board, depth, move_time, stop=_stop_event)
+    if move is None:
+        return None, None, time.perf_counter() - start, stats.to_dict()
+    board.push(move)
+    reply = predict_reply(board)
+    return (move.uci(), reply.uci() if reply else None,
+            time.perf_counter() - start, stats.to_dict())
+
+# -----------------------------------------------------------------
+# Game loop side
+# -----------------------------------------------------------------
+class AIWorker:
+    """
+    Runs get_ai_move in a separate process so the pygame loop keeps
+    drawing while the engine thinks. A process rather than a thread, since
+    a CPU-bound search would hold the GIL and starve the frame loop.
+
+    Pondering: after each engine move, ponder() starts the search for the
+    position after the human's expected reply. If the human plays it,
+    start() adopts the running search instead of starting over; otherwise
+    the speculative search is stopped and its work survives only in the
+    worker's transposition table.
+    """
+    def __init__(self):
+        mp_context = multiprocessing.get_context("spawn")
+        self._stop = mp_context.Event()
+        self._executor = ProcessPoolExecutor(
+            max_workers=1, mp_context=mp_context,
+            initializer=_init_worker, initargs=(self._stop,)
+        )
+        self._future = None
+        self._cancelled = None
+        self._queued = None       # (position, depth, move_time) waiting for _cancelled to stop
+        self._expected_reply = None
+        self._ponder = None       # (position, settings, start time) while pondering
+        self._ponder_hit = None   # (start time, hit time) until its result is read
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+        self.ponder_saved = 0.0
+        self.last_stats = None    # SearchStats.to_dict() of the last move played
+
+    @staticmethod
+    def _position(board):
+        return board.root().fen(), [move.uci() for move in board.move_stack]
+
+    def _submit(self, position, depth, move_time):
+        self.cancel()
+        self._queued = (position, depth, move_time)
+        self.poll()
+
+    def poll(self):
+        """
+        Send the queued search to the worker once the cancelled one has
+        stopped. The stop flag is shared, so it may only be cleared after
+        the old search has seen it; the game loop calls this every frame
+        rather than blocking on it.
+        """
+        if self._queued is None:
+            return
+        if self._cancelled is not None:
+            if not self._cancelled.done():
+                return
+            self._cancelled = None
+        self._stop.clear()
+        (fen, moves), depth, move_time = self._queued
+        self._queued = None
+        self._future = self._executor.submit(search_position, fen, moves, depth, move_time)
+
+    def queued(self):
+        """True while a search waits for a cancelled one to stop."""
+        return self._queued is not None
+
+    def start(self, board, depth, move_time=0):
+        """Begin searching a copy of board, dropping any search in flight."""
+        position = self._position(board)
+        if self._ponder is not None:
+            ponder_position, ponder_settings, started = self._ponder
+            self._ponder = None
+            if ponder_position == position and ponder_settings == (depth, move_time):
+                self.ponder_hits += 1
+                self._ponder_hit = (started, time.perf_counter())
+                return
+            self.ponder_misses += 1
+        self._submit(position, depth, move_time)
+
+    def ponder(self, board, depth, move_time=0):
+        """Search the position after the expected reply to the engine's last move."""
+        reply = self._expected_reply
+        if reply is None or not board.is_legal(reply):
+            return
+        board = board.copy()
+        board.push(reply)
+        position = self._position(board)
+        self._submit(position, depth, move_time)
+        self._ponder = (position, (depth, move_time), time.perf_counter())
+
+    def ready(self):
+        self.poll()
+        return self._future is not None and self._future.done()
+
+    def result(self):
+        """Return the finished search's move (None if it had none) and reset."""
+        uci, reply, elapsed, stats = self._future.result()
+        self._future = None
+        self._expected_reply = chess.Move.from_uci(reply) if reply else None
+        stats["ponder_hit"] = self._ponder_hit is not None
+        if self._ponder_hit is not None:
+            started, hit = self._ponder_hit
+            self._ponder_hit = None
+            self.ponder_saved += min(elapsed, hit - started)
+        stats.update(ponder_hits=self.ponder_hits, ponder_misses=self.ponder_misses,
+                     ponder_saved=round(self.ponder_saved, 2))
+        self.last_stats = stats
+        if STATS_LOG:
+            log_stats(stats, STATS_LOG)
+        return chess.Move.from_uci(uci) if uci else None
+
+    def cancel(self):
+        self._ponder = None
+        self._ponder_hit = None
+        self._queued = None
+        if self._future is not None:
+            self._stop.set()
+            self._cancelled = self._future
+            self._future = None
+
+    def shutdown(self):
+        self.cancel()
+        # A parallel search pool lives inside the worker process; close it
+        # from there, since worker processes exit without running atexit hooks
+        self._executor.submit(shutdown_search_pool).result()
+        self._executor.shutdown(wait=True)
+
+def log_stats(stats, path=STATS_LOG):
+    """Append one search's stats to a JSON-lines file."""
+    with open(path, "a") as f:
+        f.write(json.dumps(stats) + "\n")
+
+_worker = None
+
+def get_ai_worker():
+    """Shared worker, started on first use so its search cache lasts across games."""
+    global _worker
+    if _worker is None:
+        _worker = AIWorker()
+    return _worker
+
+def shutdown_ai_worker():
+    global _worker
+    if _worker is not None:
+        _worker.shutdown()
+        _worker = None
@@ -0,0 +1,48 @@
+"""
+Regression tests for the incremental evaluation kept by make/unmake.
+
+    python -m pytest -q
+"""
+import random
+import chess
+import pytest
+from src.ai import SearchContext, _centipawns, get_alphabeta_move, position
+from src.bench import PERFT_FENS
+
+@pytest.mark.parametrize("fen", PERFT_FENS)
+def test_incremental_score(fen):
+    """The score kept by make/unmake matches a full recompute along random lines."""
+    rng = random.Random(fen)
+    pos = position(chess.Board(fen))
+    start = (pos.score, pos.key, pos.fen())
+    for _ in range(50):
+        line = []
+        for _ in range(12):
+            moves = pos.generate_legal()
+            if not moves:
+                break
+            if not pos.is_check() and rng.random() < 0.1:
+                pos.make_null()
+                line.append(None)
+            else:
+                move = rng.choice(moves)
+                pos.make(move)
+                line.append(move)
+            assert pos.score == pos.compute_score() == _centipawns(pos.to_board()), pos.fen()
+        for move in reversed(line):
+            if move is None:
+                pos.unmake_null()
+            else:
+                pos.unmake()
+        assert (pos.score, pos.key, pos.fen()) == start
+
+@pytest.mark.parametrize("fen", PERFT_FENS)
+def test_incremental_search_matches_full(fen):
+    """A search on the incremental score finds what a full rescan finds."""
+    results = []
+    for evaluator in ("incremental", "squares"):
+        board = chess.Board(fen)
+        ctx = SearchContext(board, tt=None, evaluator=evaluator)
+        move = get_alphabeta_move(board, 3, ctx)
+        results.append((move, ctx.score, ctx.nodes + ctx.qnodes))
+    assert results[0] == results[1]
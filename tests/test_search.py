@@ -0,0 +1,51 @@
+"""
+Regression tests for the search, its board and static exchange evaluation.
+
+    python -m pytest -q
+"""
+import chess
+import pytest
+from src.ai import TranspositionTable, position, search_move, see
+from src.bench import BENCH_FENS, SEE_CASES, run_search
+from src.searchboard import encode_move, perft
+
+# Published perft counts (chessprogramming.org) at depth 3
+PERFT_DEPTH_3 = {
+    chess.STARTING_FEN: 8902,
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1": 97862,
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1": 2812,
+    "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1": 9467,
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8": 62379,
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10": 89890,
+}
+
+# -----------------------------------------------------------------
+# Static exchange evaluation
+# -----------------------------------------------------------------
+@pytest.mark.parametrize("fen, uci, expected", SEE_CASES)
+def test_see(fen, uci, expected):
+    pos = position(chess.Board(fen))
+    assert see(pos, encode_move(chess.Move.from_uci(uci))) == expected
+
+# -----------------------------------------------------------------
+# Perft
+# -----------------------------------------------------------------
+@pytest.mark.parametrize("fen, nodes", PERFT_DEPTH_3.items())
+def test_perft(fen, nodes):
+    assert perft(position(chess.Board(fen)), 3) == nodes
+
+# -----------------------------------------------------------------
+# Search
+# -----------------------------------------------------------------
+@pytest.mark.parametrize("algorithm", ["minimax", "alphabeta", "pvs"])
+def test_root_move_when_fifty_moves_claimable(algorithm):
+    """A claimable but unclaimed fifty-move draw still needs a move at the root."""
+    board = chess.Board("8/8/4k3/8/8/3K4/8/R7 w - - 100 80")
+    move, _ = search_move(board, 3, algorithm=algorithm, parallel=False)
+    assert move in board.legal_moves
+
+def test_transposition_table_saves_nodes():
+    """Over the bench suite, the table cuts the nodes a fixed-depth search needs."""
+    plain = sum(run_search(fen, 4, tt=None)[1].nodes for fen in BENCH_FENS)
+    table = sum(run_search(fen, 4, tt=TranspositionTable(16))[1].nodes for fen in BENCH_FENS)
+    assert table < plain